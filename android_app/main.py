@@ -5,6 +5,7 @@ Converts text and Word documents to audio and records voice
 
 import os
 import json
+import time
 import requests
 from datetime import datetime
 from threading import Thread
@@ -177,11 +178,25 @@ class TextToSpeechScreen(Screen):
     def _send_conversion_request(self, text):
         try:
             data = {'text': text}
+            # The server queues the conversion and answers with a job id right away
             response = requests.post(
                 f"{self.api_url}/text-to-audio",
                 data=data,
+                headers={'Accept': 'application/json'},
                 timeout=60
             )
+            response.raise_for_status()
+            status_url = f"{self.api_url}{response.json()['status_url']}"
+            
+            while True:
+                job = requests.get(status_url, timeout=30).json()
+                if job.get('status') == 'done':
+                    break
+                if job.get('status') in ('error', 'notfound'):
+                    raise RuntimeError(job.get('message') or 'Conversion failed')
+                progress = job.get('progress', 0)
+                Clock.schedule_once(lambda x, p=progress: self._update_status(f'Converting... {p}%', (1, 1, 0, 1)), 0)
+                time.sleep(1)
             
             Clock.schedule_once(lambda x: self._update_status('✓ Conversion complete!', (0, 1, 0, 1)), 0)
         except Exception as e:
@@ -0,0 +1,260 @@
+"""
+Benchmark of the conversion pipeline, runnable offline.
+
+Generates synthetic .docx files (10 to 10,000 paragraphs by default) and, for
+each size, measures in a fresh subprocess:
+
+  * extraction: ``convert_word_to_text``
+  * chunking: ``chunk_text_parts`` over the streamed paragraphs
+  * a full job: ``_start_background_conversion`` with the ``fake`` TTS engine,
+    which writes canned silent MP3 frames after DOCUVOICE_FAKE_TTS_LATENCY_MS
+
+and reports throughput, peak RSS and the job's per-stage timings. Each run
+works in a temporary directory, so the repository's uploads/, audio_files/
+and databases are never touched.
+
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 10 1000 --latency-ms 50 --json out.json
+    python benchmarks/bench_pipeline.py --compare baseline.json   # exit 1 on regressions
+    python benchmarks/bench_pipeline.py --sizes 50 --engine gtts  # real gTTS (needs network)
+    python benchmarks/bench_pipeline.py --no-async --workers 8    # threaded synthesis instead of asyncio
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+WORDS = (
+    'audio document paragraph voice speech convert server queue worker stream chunk sentence part '
+    'library upload render cache engine latency file progress result output player format frame'
+).split()
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def _paragraph(rng):
+    sentences = []
+    for _ in range(rng.randint(1, 4)):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(5, 18))]
+        sentences.append(' '.join(words).capitalize() + '.')
+    return ' '.join(sentences)
+
+
+def make_docx(path, paragraphs, seed=0):
+    """Write a minimal but valid .docx with ``paragraphs`` paragraphs of filler text."""
+    rng = random.Random(seed)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        zf.writestr('_rels/.rels', _RELS)
+        with zf.open('word/document.xml', 'w') as fh:
+            fh.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                     b'<w:body>')
+            for _ in range(paragraphs):
+                text = escape(_paragraph(rng))
+                fh.write(f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'.encode('utf-8'))
+            fh.write(b'<w:sectPr/></w:body></w:document>')
+
+
+def _peak_rss_mb(who='RUSAGE_SELF'):
+    """Peak RSS of this process, or with ``'RUSAGE_CHILDREN'`` of the largest finished child."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(getattr(resource, who)).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(paragraphs, workdir):
+    """Measure one document size; runs inside the worker subprocess."""
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_ROOT)
+    from word_to_audio import app as docuvoice
+
+    source = os.path.join(workdir, f'bench_{paragraphs}.docx')
+    make_docx(source, paragraphs)
+    size = os.path.getsize(source)
+    result = {'paragraphs': paragraphs, 'docx_bytes': size}
+
+    start = time.perf_counter()
+    text = docuvoice.convert_word_to_text(source)
+    elapsed = time.perf_counter() - start
+    result['chars'] = len(text)
+    result['extract_seconds'] = round(elapsed, 4)
+    result['extract_paragraphs_per_s'] = round(paragraphs / elapsed, 1)
+    del text
+
+    start = time.perf_counter()
+    parts = sum(1 for _ in docuvoice.chunk_text_parts(docuvoice.iter_docx_paragraphs(source),
+                                                      docuvoice.TTS_CHUNK_CHARS))
+    elapsed = time.perf_counter() - start
+    result['parts'] = parts
+    result['chunk_seconds'] = round(elapsed, 4)
+
+    # the job deletes its source when it finishes, so give it a copy
+    job_source = os.path.join(docuvoice.UPLOAD_FOLDER, os.path.basename(source))
+    shutil.copyfile(source, job_source)
+    job_id = f'bench{paragraphs}'
+    engine = docuvoice.TTS_DEFAULT_ENGINE
+    docuvoice.JOB_STORE.create(job_id, 'word', job_source, 'bench', {'engine': engine}, status='running')
+    start = time.perf_counter()
+    docuvoice._start_background_conversion(job_id, job_source, 'bench', engine=engine)
+    elapsed = time.perf_counter() - start
+    job = docuvoice.JOB_STORE.get(job_id)
+    if job['status'] != 'done':
+        raise RuntimeError(f"conversion of {paragraphs} paragraphs failed: {job['message']}")
+    result['job_seconds'] = round(elapsed, 4)
+    result['job_parts_per_s'] = round(parts / elapsed, 1)
+    result['job_chars_per_s'] = round(result['chars'] / elapsed, 1)
+    result['output_bytes'] = os.path.getsize(job['audio_path'])
+    result['stages'] = job['timings']
+    result['peak_rss_mb'] = _peak_rss_mb()
+    # documents are parsed in the CPU pool's worker processes; they only count
+    # towards RUSAGE_CHILDREN once they have exited
+    if docuvoice._CPU_POOL is not None:
+        docuvoice._CPU_POOL.shutdown(wait=True)
+    result['peak_rss_children_mb'] = _peak_rss_mb('RUSAGE_CHILDREN')
+    return result
+
+
+def run_isolated(paragraphs, latency_ms, workers, cache, engine='fake', use_async=True, async_concurrency=64):
+    """Run one case in a fresh interpreter so peak RSS belongs to that size alone."""
+    workdir = tempfile.mkdtemp(prefix='docuvoice-bench-')
+    env = dict(
+        os.environ,
+        DOCUVOICE_TTS_ENGINE=engine,
+        DOCUVOICE_FAKE_TTS_LATENCY_MS=str(latency_ms),
+        DOCUVOICE_TTS_WORKERS=str(workers),
+        DOCUVOICE_TTS_ASYNC='1' if use_async else '0',
+        DOCUVOICE_TTS_ASYNC_CONCURRENCY=str(async_concurrency),
+        DOCUVOICE_TTS_CACHE_MB='512' if cache else '0',
+        DOCUVOICE_JOBS_DB=os.path.join(workdir, 'jobs.db'),
+        DOCUVOICE_LIBRARY_DB=os.path.join(workdir, 'library.db'),
+    )
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run-case', str(paragraphs), '--workdir', workdir],
+            env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f'benchmark of {paragraphs} paragraphs failed:\n{proc.stderr}')
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_table(results):
+    header = (f"{'paras':>7} {'parts':>6} {'extract s':>10} {'para/s':>10} {'chunk s':>8} "
+              f"{'job s':>8} {'parts/s':>8} {'chars/s':>10} {'rss MB':>7} {'child MB':>8}  stages (s)")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        # repeated stages (synthesize: one per part) also show the mean per call
+        stages = ' '.join(
+            f"{name}={info['seconds']:.3f}" + (f"/{info['count']}={1000 * info['seconds'] / info['count']:.1f}ms"
+                                               if info['count'] > 1 else '')
+            for name, info in r['stages'].items()
+        )
+        print(f"{r['paragraphs']:>7} {r['parts']:>6} {r['extract_seconds']:>10.4f} {r['extract_paragraphs_per_s']:>10.0f} "
+              f"{r['chunk_seconds']:>8.4f} {r['job_seconds']:>8.3f} {r['job_parts_per_s']:>8.1f} "
+              f"{r['job_chars_per_s']:>10.0f} {str(r['peak_rss_mb']):>7} {str(r.get('peak_rss_children_mb')):>8}  {stages}")
+
+
+def compare(results, baseline_path, tolerance):
+    """Return a list of regressions against a previous --json report."""
+    with open(baseline_path, encoding='utf-8') as fh:
+        baseline = {r['paragraphs']: r for r in json.load(fh)['results']}
+    regressions = []
+    for r in results:
+        old = baseline.get(r['paragraphs'])
+        if old is None:
+            continue
+        for key in ('extract_paragraphs_per_s', 'job_chars_per_s'):
+            if r[key] < old[key] * (1 - tolerance):
+                regressions.append(f"{r['paragraphs']} paragraphs: {key} {old[key]} -> {r[key]}")
+        for key in ('peak_rss_mb', 'peak_rss_children_mb'):
+            if r.get(key) and old.get(key) and r[key] > old[key] * (1 + tolerance):
+                regressions.append(f"{r['paragraphs']} paragraphs: {key} {old[key]} -> {r[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='paragraph counts to run')
+    parser.add_argument('--latency-ms', type=int, default=0, help='simulated TTS latency per part')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='DOCUVOICE_TTS_WORKERS for the job; only used with --no-async')
+    parser.add_argument('--no-async', dest='use_async', action='store_false',
+                        help='synthesize on a thread pool per job (DOCUVOICE_TTS_ASYNC=0)')
+    parser.add_argument('--async-concurrency', type=int, default=64,
+                        help='DOCUVOICE_TTS_ASYNC_CONCURRENCY for the asyncio engine')
+    parser.add_argument('--cache', action='store_true', help='leave the segment cache on (off by default)')
+    parser.add_argument('--engine', default='fake',
+                        help='TTS engine; anything but fake needs its tools or network (e.g. gtts with '
+                             'DOCUVOICE_GTTS_POOL_SIZE=0 vs pooled)')
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    parser.add_argument('--compare', metavar='PATH', help='baseline JSON; exit 1 if anything regressed')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown for --compare (0.2 = 20%%)')
+    parser.add_argument('--run-case', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case is not None:
+        print(json.dumps(run_case(args.run_case, args.workdir)))
+        return 0
+
+    results = []
+    for paragraphs in args.sizes:
+        print(f'running {paragraphs} paragraphs...', file=sys.stderr)
+        results.append(run_isolated(paragraphs, args.latency_ms, args.workers, args.cache, args.engine,
+                                    args.use_async, args.async_concurrency))
+    print_table(results)
+
+    if args.json:
+        report = {
+            'settings': {'latency_ms': args.latency_ms, 'workers': args.workers, 'cache': args.cache,
+                         'engine': args.engine, 'async': args.use_async,
+                         'async_concurrency': args.async_concurrency},
+            'python': sys.version.split()[0],
+            'results': results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
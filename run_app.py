@@ -35,15 +35,27 @@ def _open_browser_later(url: str, delay: float = 0.8):
             pass
 
 if __name__ == '__main__':
+    # the EXE is also started as each worker of the CPU process pool
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     port = 5000
     url = f'http://127.0.0.1:{port}/'
     # try to open browser after a short delay so the server can start
     _open_browser_later(url)
 
-    # Run Flask app (app should be the Flask application instance)
-    # Bind to localhost so the EXE only serves locally
+    # Prefer waitress over Flask's development server when it is bundled;
+    # bind to localhost so the EXE only serves locally
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
     try:
-        app.run(host='127.0.0.1', port=port, debug=False)
+        if serve is not None:
+            # progress pages keep /job-events (and /job-stream) open, each on a thread
+            serve(app, host='127.0.0.1', port=port, threads=32)
+        else:
+            app.run(host='127.0.0.1', port=port, debug=False)
     except AttributeError:
         # Provide a clearer error if `app` isn't the Flask instance
         raise RuntimeError(
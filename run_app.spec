@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('word_to_audio\\templates', 'word_to_audio\\templates'), ('word_to_audio\\static', 'word_to_audio\\static')],
-    hiddenimports=[],
+    hiddenimports=['waitress'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,109 @@
+"""
+Production launcher for DocuVoice.
+
+Runs the app under gunicorn (several worker processes, Linux/macOS) or waitress
+(one multi-threaded process, also works on Windows) instead of Flask's
+development server. Jobs, progress and the audio library live in SQLite, so
+any worker process can answer /job-status, /job-events or /library for a job
+started by another one.
+
+    python serve.py                      # picks gunicorn if installed, else waitress
+    DOCUVOICE_SERVER=waitress python serve.py
+    DOCUVOICE_WEB_WORKERS=4 DOCUVOICE_WEB_THREADS=16 python serve.py
+"""
+import os
+import sys
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+HOST = os.environ.get('DOCUVOICE_HOST', '0.0.0.0')
+PORT = _env_int('DOCUVOICE_PORT', 5000)
+SERVER = os.environ.get('DOCUVOICE_SERVER', 'auto').lower()
+# worker processes (gunicorn only) and request threads per process; every open
+# progress page holds a thread for /job-events (and one more for /job-stream
+# while listening), up to DOCUVOICE_STREAM_MAX_SECONDS at a time, so leave room
+WEB_WORKERS = max(1, _env_int('DOCUVOICE_WEB_WORKERS', 2))
+WEB_THREADS = max(1, _env_int('DOCUVOICE_WEB_THREADS', 32))
+
+
+def _start_job_workers():
+    from word_to_audio.app import _start_job_workers as start
+    # resume queued and interrupted jobs without waiting for the first request
+    start()
+
+
+def run_gunicorn():
+    from gunicorn.app.base import BaseApplication
+
+    class DocuVoiceApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{HOST}:{PORT}')
+            self.cfg.set('workers', WEB_WORKERS)
+            # threaded workers so SSE and audio streams don't tie up a whole process
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', WEB_THREADS)
+            # each worker must import the app itself: the job owner id, the
+            # SQLite connections and the job threads are all per process
+            self.cfg.set('preload_app', False)
+            self.cfg.set('post_worker_init', lambda worker: _start_job_workers())
+            self.cfg.set('accesslog', '-')
+            cert = os.environ.get('DOCUVOICE_CERT')
+            key = os.environ.get('DOCUVOICE_KEY')
+            if cert and key and os.path.exists(cert) and os.path.exists(key):
+                self.cfg.set('certfile', cert)
+                self.cfg.set('keyfile', key)
+
+        def load(self):
+            from word_to_audio.app import app
+            return app
+
+    DocuVoiceApplication().run()
+
+
+def run_waitress():
+    from waitress import serve
+    from word_to_audio.app import app
+
+    if 'DOCUVOICE_WEB_WORKERS' in os.environ and WEB_WORKERS > 1:
+        app.logger.warning('waitress runs a single process; DOCUVOICE_WEB_WORKERS is ignored.')
+    if os.environ.get('DOCUVOICE_CERT') or os.environ.get('DOCUVOICE_KEY'):
+        app.logger.warning('waitress does not terminate TLS; put a reverse proxy in front or use gunicorn.')
+    _start_job_workers()
+    print(f'Starting DocuVoice on {HOST}:{PORT} (waitress, {WEB_THREADS} threads)')
+    serve(app, host=HOST, port=PORT, threads=WEB_THREADS)
+
+
+def _available(module):
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def main():
+    server = SERVER
+    if server == 'auto':
+        # gunicorn needs fork(), so Windows always gets waitress
+        if os.name != 'nt' and _available('gunicorn'):
+            server = 'gunicorn'
+        elif _available('waitress'):
+            server = 'waitress'
+        else:
+            sys.exit('No production server found: pip install waitress (or gunicorn on Linux/macOS).')
+    if server == 'gunicorn':
+        run_gunicorn()
+    elif server == 'waitress':
+        run_waitress()
+    else:
+        sys.exit(f"Unknown DOCUVOICE_SERVER '{SERVER}' (use auto, gunicorn or waitress).")
+
+
+if __name__ == '__main__':
+    main()
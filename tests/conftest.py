@@ -0,0 +1,67 @@
+import os
+import sys
+import tempfile
+import zipfile
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app creates uploads/, audio_files/ and its databases in the working
+# directory at import time, so import it from a scratch directory.
+WORKDIR = tempfile.mkdtemp(prefix='docuvoice-tests-')
+os.environ.update(
+    DOCUVOICE_TTS_ENGINE='fake',
+    DOCUVOICE_TTS_CACHE_MB='0',
+    DOCUVOICE_CPU_WORKERS='0',
+    DOCUVOICE_JOBS_DB=os.path.join(WORKDIR, 'jobs.db'),
+    DOCUVOICE_LIBRARY_DB=os.path.join(WORKDIR, 'library.db'),
+)
+os.chdir(WORKDIR)
+sys.path.insert(0, REPO_ROOT)
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def write_docx(path, body_xml, extra_ns=''):
+    """Write a minimal .docx whose <w:body> holds ``body_xml``."""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        zf.writestr('_rels/.rels', _RELS)
+        zf.writestr(
+            'word/document.xml',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<w:document xmlns:w="{W_NS}" {extra_ns}><w:body>{body_xml}<w:sectPr/></w:body></w:document>',
+        )
+    return path
+
+
+@pytest.fixture(scope='session')
+def docuvoice():
+    from word_to_audio import app
+    return app
+
+
+@pytest.fixture
+def make_docx(tmp_path):
+    def make(body_xml, extra_ns='', name='doc.docx'):
+        return write_docx(str(tmp_path / name), body_xml, extra_ns)
+    return make
@@ -0,0 +1,31 @@
+import asyncio
+import threading
+
+
+def test_engine_cap_bounds_concurrent_calls(docuvoice, tmp_path):
+    class CountingEngine(docuvoice.FakeEngine):
+        name = 'counting'
+        max_concurrency = 2
+
+        def __init__(self):
+            super().__init__()
+            self.running = 0
+            self.peak = 0
+            self.lock = threading.Lock()
+
+        async def synthesize_async(self, text, lang, out_path):
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            await asyncio.sleep(0.02)
+            with self.lock:
+                self.running -= 1
+            docuvoice._write_file(out_path, self._frames(text))
+
+    engine = CountingEngine()
+    synthesizer = docuvoice.AsyncSynthesizer(16)
+    futures = [synthesizer.submit(f'Part {i}.', str(tmp_path / f'{i}.mp3'), engine) for i in range(8)]
+    for future in futures:
+        future.result(timeout=10)
+    assert engine.peak == 2
+    assert all((tmp_path / f'{i}.mp3').exists() for i in range(8))
@@ -0,0 +1,48 @@
+import wave
+
+import pytest
+
+
+def _fake_mp3(path, frames, docuvoice):
+    path.write_bytes(docuvoice.FakeEngine.FRAME * frames)
+    return str(path)
+
+
+def _wav(path, frames, rate=8000):
+    with wave.open(str(path), 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(bytes(range(256)) * (frames * 2 // 256) + bytes(frames * 2 % 256))
+    return str(path)
+
+
+def test_mp3_parts_are_joined_frame_by_frame(docuvoice, tmp_path):
+    parts = [_fake_mp3(tmp_path / f'part{i}.mp3', n, docuvoice) for i, n in enumerate((10, 25, 5))]
+    out = str(tmp_path / 'out.mp3')
+    seconds = docuvoice._combine_parts(parts, out)
+    assert seconds == pytest.approx(40 * 0.024)
+    assert docuvoice._audio_duration(out) == pytest.approx(seconds)
+    # the Xing/Info frame in front is skipped, leaving exactly the parts' frames
+    with open(out, 'rb') as fh:
+        assert list(docuvoice._iter_mp3_file_frames(fh)) == [docuvoice.FakeEngine.FRAME] * 40
+
+
+def test_mp3_parts_without_frames_are_rejected(docuvoice, tmp_path):
+    empty = tmp_path / 'empty.mp3'
+    empty.write_bytes(b'not audio')
+    with pytest.raises(RuntimeError):
+        docuvoice._combine_parts([str(empty)], str(tmp_path / 'out.mp3'))
+
+
+def test_wav_parts_are_joined(docuvoice, tmp_path):
+    parts = [_wav(tmp_path / 'a.wav', 8000), _wav(tmp_path / 'b.wav', 4000)]
+    out = str(tmp_path / 'out.wav')
+    assert docuvoice._combine_parts(parts, out) == pytest.approx(1.5)
+    expected = b''
+    for part in parts:
+        with wave.open(part, 'rb') as src:
+            expected += src.readframes(src.getnframes())
+    with wave.open(out, 'rb') as src:
+        assert (src.getnchannels(), src.getsampwidth(), src.getframerate()) == (1, 2, 8000)
+        assert src.readframes(src.getnframes()) == expected
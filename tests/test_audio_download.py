@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def audio_file(docuvoice):
+    folder = os.path.join(docuvoice.AUDIO_FOLDER, 'download_test')
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, 'clip.mp3')
+    data = bytes(range(256)) * 40
+    with open(path, 'wb') as fh:
+        fh.write(data)
+    return '/audio/download_test/clip.mp3', data
+
+
+def test_range_requests_get_partial_content(docuvoice, audio_file):
+    url, data = audio_file
+    response = docuvoice.app.test_client().get(url, headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(data)}'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.get_data() == data[100:200]
+
+
+def test_unchanged_files_are_not_sent_again(docuvoice, audio_file):
+    url, data = audio_file
+    client = docuvoice.app.test_client()
+    first = client.get(url)
+    assert first.get_data() == data
+    etag = first.headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    # a stale validator on If-Range gets the whole file rather than a wrong slice
+    stale = client.get(url, headers={'Range': 'bytes=0-9', 'If-Range': '"other"'})
+    assert (stale.status_code, stale.get_data()) == (200, data)
+
+
+def test_internal_folders_are_not_served(docuvoice):
+    client = docuvoice.app.test_client()
+    assert client.get('/audio/_tts_cache/anything.seg').status_code == 404
+    assert client.get('/audio/download_test/tmp_job').status_code == 404
@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def store(docuvoice, tmp_path, monkeypatch):
+    store = docuvoice.JobStore(str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(docuvoice, 'JOB_STORE', store)
+    return store
+
+
+def _batch(store, children=2):
+    store.create('batch', 'batch', None, 'batch', {'documents': children}, status='waiting')
+    for i in range(children):
+        store.create(f'doc{i}', 'word', f'doc{i}.docx', 'word', parent_id='batch')
+    return store
+
+
+def test_released_batch_keeps_its_progress(docuvoice, store):
+    _batch(store)
+    for child in ('doc0', 'doc1'):
+        store.update(child, status='running', progress=50)
+    assert docuvoice._batch_payload(store.get('batch'))['progress'] == 47
+
+    for child in ('doc0', 'doc1'):
+        store.update(child, status='done', progress=100)
+    assert store.release_batch('batch')
+    job = store.get('batch')
+    assert job['status'] == 'pending'
+    assert docuvoice._job_payload(job)['progress'] == 95
+
+
+def test_stale_batches_are_failed(store):
+    _batch(store)
+    store.create('busy', 'batch', None, 'batch', status='preparing')
+    store.create('busy-doc', 'word', 'busy.docx', 'word', parent_id='busy')
+    time.sleep(0.01)
+    cutoff = time.time()
+    store.update('busy-doc', status='running', progress=10)
+
+    assert store.fail_stale_batches(cutoff) == 1
+    assert store.get('batch')['status'] == 'error'
+    # a child was active recently, so this batch is still making progress
+    assert store.get('busy')['status'] == 'preparing'
@@ -0,0 +1,39 @@
+import os
+import zipfile
+
+import pytest
+
+from conftest import write_docx
+
+
+def _zip_of_docs(tmp_path, count):
+    zip_path = str(tmp_path / 'batch.zip')
+    with zipfile.ZipFile(zip_path, 'w') as zf:
+        for i in range(count):
+            doc = write_docx(str(tmp_path / f'doc{i}.docx'), f'<w:p><w:r><w:t>Document {i}</w:t></w:r></w:p>')
+            zf.write(doc, f'folder/doc{i}.docx')
+        zf.writestr('__MACOSX/folder/._doc0.docx', b'junk')
+        zf.writestr('folder/~$doc0.docx', b'lock')
+        zf.writestr('notes.txt', b'skip me')
+    return zip_path
+
+
+def test_extracts_only_documents(docuvoice, tmp_path):
+    documents = docuvoice._extract_batch_zip(_zip_of_docs(tmp_path, 2))
+    try:
+        assert [name for name, _, _ in documents] == ['doc0.docx', 'doc1.docx']
+        assert all(os.path.exists(path) for _, path, _ in documents)
+    finally:
+        for _, path, _ in documents:
+            os.remove(path)
+
+
+def test_extracted_bytes_are_capped_across_the_batch(docuvoice, tmp_path):
+    zip_path = _zip_of_docs(tmp_path, 3)
+    size = os.path.getsize(str(tmp_path / 'doc0.docx'))
+    before = set(os.listdir(docuvoice.UPLOAD_FOLDER))
+    budget = [size * 2 + 10]
+    with pytest.raises(docuvoice.UploadRejected, match='too large altogether'):
+        docuvoice._extract_batch_zip(zip_path, budget)
+    # nothing from the rejected zip is left behind
+    assert set(os.listdir(docuvoice.UPLOAD_FOLDER)) == before
@@ -0,0 +1,25 @@
+def test_short_lines_are_merged_with_a_full_stop(docuvoice):
+    parts = list(docuvoice.chunk_text_parts(['Heading', 'First item', 'A sentence already ended.'], 200))
+    assert parts == ['Heading. First item. A sentence already ended.']
+
+
+def test_parts_stay_under_the_target(docuvoice):
+    sentence = 'This sentence is about forty characters. '
+    paragraph = (sentence * 20).strip()
+    parts = list(docuvoice.chunk_text_parts([paragraph, 'Tail'], 100))
+    assert all(len(p) <= 100 for p in parts)
+    # long paragraphs break between sentences, not inside them
+    assert all(p.startswith('This sentence') for p in parts[:-1])
+    assert ' '.join(parts) == paragraph + ' Tail'
+
+
+def test_an_overlong_sentence_is_split(docuvoice):
+    words = ' '.join(f'word{i}' for i in range(100))
+    parts = list(docuvoice.chunk_text_parts([words], 60))
+    assert len(parts) > 1
+    assert all(len(p) <= 60 for p in parts)
+    assert ' '.join(parts).split() == words.split()
+
+
+def test_blank_paragraphs_are_skipped(docuvoice):
+    assert list(docuvoice.chunk_text_parts(['', '   ', 'Only  this\tone'], 200)) == ['Only this one']
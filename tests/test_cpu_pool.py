@@ -0,0 +1,61 @@
+import os
+import time
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def cpu_pool(docuvoice, monkeypatch):
+    """One worker process for the test, shut down afterwards."""
+    monkeypatch.setattr(docuvoice, 'CPU_WORKERS', 1)
+    monkeypatch.setattr(docuvoice, '_CPU_POOL', None)
+    yield
+    pool = docuvoice._CPU_POOL
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _text_source(docuvoice, lines):
+    job_id = uuid.uuid4().hex
+    source = os.path.join(docuvoice.UPLOAD_FOLDER, f'{job_id}.txt')
+    with open(source, 'w', encoding='utf-8') as fh:
+        fh.writelines(line + '\n' for line in lines)
+    return job_id, source
+
+
+def test_conversion_reads_parts_from_the_worker_process(docuvoice, cpu_pool):
+    lines = [f'Paragraph number {idx} of the document.' for idx in range(40)]
+    job_id, source = _text_source(docuvoice, lines)
+    docuvoice.JOB_STORE.create(job_id, 'text', source, 'text_to_speech', {'engine': 'fake'})
+    docuvoice.JOB_STORE.update(job_id, status='running', owner='tests', heartbeat_at=time.time())
+
+    docuvoice._start_background_conversion(job_id, source, 'text_to_speech', chunk_chars=120, engine='fake',
+                                           output_label='text_to_audio')
+    job = docuvoice.JOB_STORE.get(job_id)
+    assert job['status'] == 'done', job['message']
+    assert docuvoice._CPU_POOL is not None
+    assert os.path.getsize(job['audio_path']) > 0
+    # every part cut by the worker was synthesized
+    assert job['timings']['synthesize']['count'] == len(list(docuvoice.chunk_text_parts(lines, 120)))
+
+
+def test_abandoned_extraction_stops_the_worker(docuvoice, cpu_pool, tmp_path, monkeypatch):
+    lines = [f'Sentence {idx}.' for idx in range(200000)]
+    _, source = _text_source(docuvoice, lines)
+    futures = []
+    submit = docuvoice._submit_cpu
+
+    def capture(pool, fn, *args):
+        future = submit(pool, fn, *args)
+        futures.append(future)
+        return future
+
+    monkeypatch.setattr(docuvoice, '_submit_cpu', capture)
+    parts = docuvoice._iter_source_parts(source, 20, str(tmp_path))
+    assert next(parts) == 'Sentence 0.'
+    parts.close()
+
+    assert not (tmp_path / 'parts.jsonl').exists()
+    written = futures[0].result(timeout=60)
+    assert written < len(lines)
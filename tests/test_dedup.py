@@ -0,0 +1,26 @@
+import os
+import uuid
+
+
+def test_duplicate_uploads_attach_to_the_queued_job(docuvoice, tmp_path):
+    store = docuvoice.JobStore(str(tmp_path / 'jobs.db'))
+    assert store.create_or_attach('one', 'word', 'a.docx', 'word', {}, 'hash')['id'] == 'one'
+    assert store.create_or_attach('two', 'word', 'b.docx', 'word', {}, 'hash')['id'] == 'one'
+    assert store.get('two') is None
+
+
+def test_converted_documents_reuse_their_audio(docuvoice, tmp_path):
+    params = {'engine': 'fake', 'chunk_chars': 1000}
+    content_hash = uuid.uuid4().hex
+    audio = tmp_path / 'earlier.mp3'
+    audio.write_bytes(docuvoice.FakeEngine.FRAME * 10)
+    docuvoice.LIBRARY.record(str(audio), 'word_to_speech',
+                             source_hash=docuvoice._source_hash(content_hash, 'word', params))
+    upload = os.path.join(docuvoice.UPLOAD_FOLDER, f'{uuid.uuid4().hex}.docx')
+    open(upload, 'wb').close()
+
+    job = docuvoice.JOB_STORE.get(docuvoice._enqueue_upload('word', upload, 'word_to_speech', params, content_hash))
+    assert (job['status'], job['audio_path']) == ('done', os.path.normpath(str(audio)))
+    assert not os.path.exists(upload)
+    # other settings give other audio, so they don't match
+    assert docuvoice._source_hash(content_hash, 'word', {**params, 'engine': 'gtts'}) != job['source_hash']
@@ -0,0 +1,56 @@
+import pytest
+
+MC_NS = 'http://schemas.openxmlformats.org/markup-compatibility/2006'
+WPS_NS = 'http://schemas.microsoft.com/office/word/2010/wordprocessingShape'
+V_NS = 'urn:schemas-microsoft-com:vml'
+EXTRA_NS = f'xmlns:mc="{MC_NS}" xmlns:wps="{WPS_NS}" xmlns:v="{V_NS}"'
+
+
+def _textbox_paragraph(before, box_text):
+    """A paragraph with a floating text box, saved the way Word does (Choice plus VML Fallback)."""
+    box = f'<w:txbxContent><w:p><w:r><w:t>{box_text}</w:t></w:r></w:p></w:txbxContent>'
+    return (
+        f'<w:p><w:r><w:t>{before}</w:t></w:r>'
+        '<w:r><mc:AlternateContent>'
+        f'<mc:Choice Requires="wps"><w:drawing><wps:txbx>{box}</wps:txbx></w:drawing></mc:Choice>'
+        f'<mc:Fallback><w:pict><v:shape><v:textbox>{box}</v:textbox></v:shape></w:pict></mc:Fallback>'
+        '</mc:AlternateContent></w:r></w:p>'
+    )
+
+
+def test_text_box_runs_are_not_part_of_the_paragraph(docuvoice, make_docx):
+    path = make_docx(_textbox_paragraph('Before', 'BOXTEXT'), EXTRA_NS)
+    assert list(docuvoice.iter_docx_paragraphs(path)) == ['Before']
+
+
+def test_hyperlink_and_tracked_insertion_runs_are_kept(docuvoice, make_docx):
+    path = make_docx(
+        '<w:p><w:r><w:t xml:space="preserve">See </w:t></w:r>'
+        '<w:hyperlink><w:r><w:t>the docs</w:t></w:r></w:hyperlink>'
+        '<w:ins><w:r><w:t xml:space="preserve"> now</w:t></w:r></w:ins></w:p>'
+        '<w:p><w:r><w:t>a</w:t><w:tab/><w:t>b</w:t><w:br/><w:t>c</w:t></w:r></w:p>'
+    )
+    assert list(docuvoice.iter_docx_paragraphs(path)) == ['See the docs now', 'a\tb\nc']
+
+
+def test_only_top_level_paragraphs_are_read(docuvoice, make_docx):
+    path = make_docx(
+        '<w:p><w:r><w:t>One</w:t></w:r></w:p>'
+        '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Cell</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+        '<w:p/>'
+        '<w:p><w:r><w:t>Two</w:t></w:r></w:p>'
+    )
+    assert list(docuvoice.iter_docx_paragraphs(path)) == ['One', '', 'Two']
+    assert docuvoice.convert_word_to_text(path) == 'One\n\nTwo\n'
+
+
+def test_matches_python_docx(docuvoice, make_docx):
+    docx = pytest.importorskip('docx')
+    path = make_docx(
+        _textbox_paragraph('Before', 'BOXTEXT')
+        + '<w:p><w:r><w:t xml:space="preserve">Plain </w:t></w:r>'
+          '<w:hyperlink><w:r><w:t>link</w:t></w:r></w:hyperlink></w:p>',
+        EXTRA_NS,
+    )
+    expected = [p.text for p in docx.Document(path).paragraphs]
+    assert list(docuvoice.iter_docx_paragraphs(path)) == expected
@@ -0,0 +1,63 @@
+import base64
+import io
+
+import pytest
+import requests
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """Answers every request with ``status`` and a gTTS-style body carrying ``audio``."""
+
+    def __init__(self, audio=b'', status=200):
+        super().__init__()
+        self.audio = audio
+        self.status = status
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        b64 = base64.b64encode(self.audio).decode('ascii')
+        response = requests.Response()
+        response.status_code = self.status
+        response.reason = 'OK' if self.status == 200 else 'Too Many Requests'
+        response.raw = io.BytesIO(f')]}}\'\n\n[["wrb.fr","jQ1olc","[\\"{b64}\\"]",null]]\n'.encode('utf-8'))
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def _session(adapter):
+    session = requests.Session()
+    session.mount('https://', adapter)
+    return session
+
+
+def test_one_session_is_shared_and_sized_from_the_settings(docuvoice, monkeypatch):
+    monkeypatch.setenv('DOCUVOICE_GTTS_POOL_SIZE', '7')
+    engine = docuvoice.GTTSEngine()
+    session = engine.session()
+    assert engine.session() is session
+    assert session.get_adapter('https://translate.google.com')._pool_maxsize == 7
+
+    monkeypatch.setenv('DOCUVOICE_GTTS_POOL_SIZE', '0')
+    assert docuvoice.GTTSEngine().session() is None
+
+
+def test_every_request_of_a_part_goes_through_the_session(docuvoice, tmp_path):
+    adapter = ReplayAdapter(b'MP3!')
+    # gTTS sends one request per 100 characters or so
+    text = ' '.join(['A sentence of a few words.'] * 10)
+    out = tmp_path / 'part.mp3'
+    docuvoice.PooledGTTS(text, 'en', _session(adapter), 5).save(str(out))
+    assert adapter.sent > 1
+    assert out.read_bytes() == b'MP3!' * adapter.sent
+
+
+def test_throttling_is_reported_for_the_limiter(docuvoice, tmp_path):
+    tts = docuvoice.PooledGTTS('Hello.', 'en', _session(ReplayAdapter(status=429)), 5)
+    with pytest.raises(docuvoice.gTTSError) as error:
+        tts.save(str(tmp_path / 'part.mp3'))
+    assert docuvoice.GTTSEngine().error_kind(error.value) == 'throttled'
@@ -0,0 +1,41 @@
+import json
+import threading
+import time
+import uuid
+
+
+def _running_job(docuvoice):
+    job_id = uuid.uuid4().hex
+    docuvoice.JOB_STORE.create(job_id, 'text', None, 'text_to_speech', {'engine': 'fake'})
+    docuvoice.JOB_STORE.update(job_id, status='running', owner='tests', heartbeat_at=time.time())
+    return job_id
+
+
+def test_updates_bump_the_sequence_until_the_job_finishes(docuvoice):
+    job_id = _running_job(docuvoice)
+    docuvoice._update_job(job_id, progress=10)
+    first = docuvoice._JOB_EVENT_SEQ[job_id]
+    docuvoice._update_job(job_id, progress=20)
+    assert docuvoice._JOB_EVENT_SEQ[job_id] == first + 1
+    docuvoice._update_job(job_id, status='done', progress=100)
+    assert job_id not in docuvoice._JOB_EVENT_SEQ
+
+
+def test_updates_are_pushed_without_waiting_for_the_poll(docuvoice, monkeypatch):
+    monkeypatch.setattr(docuvoice, 'JOB_EVENTS_POLL_SECONDS', 30)
+    job_id = _running_job(docuvoice)
+    response = docuvoice.app.test_client().get(f'/job-events/{job_id}', buffered=False)
+    chunks = response.iter_encoded()
+    assert next(chunks).startswith(b'retry: ')
+    assert json.loads(next(chunks)[len(b'data: '):])['status'] == 'running'
+
+    threading.Timer(0.2, docuvoice._update_job, (job_id,), {'progress': 40, 'message': 'Halfway'}).start()
+    started = time.monotonic()
+    payload = json.loads(next(chunks)[len(b'data: '):])
+    assert time.monotonic() - started < 5
+    assert (payload['progress'], payload['message']) == (40, 'Halfway')
+
+    threading.Timer(0.2, docuvoice._update_job, (job_id,), {'status': 'done', 'progress': 100}).start()
+    assert json.loads(next(chunks)[len(b'data: '):])['status'] == 'done'
+    assert next(chunks, None) is None
+    response.close()
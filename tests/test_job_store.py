@@ -0,0 +1,38 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def store(docuvoice, tmp_path):
+    return docuvoice.JobStore(str(tmp_path / 'jobs.db'))
+
+
+def test_jobs_are_claimed_oldest_first(store):
+    store.create('first', 'text', 'a.txt', 'text')
+    store.create('second', 'text', 'b.txt', 'text')
+    job = store.claim_next('worker-a')
+    assert (job['id'], job['status'], job['owner']) == ('first', 'running', 'worker-a')
+    assert store.claim_next('worker-b')['id'] == 'second'
+    assert store.claim_next('worker-c') is None
+
+
+def test_finished_and_waiting_jobs_are_not_claimed(store):
+    store.create('done', 'text', 'a.txt', 'text')
+    store.update('done', status='done', progress=100)
+    store.create('batch', 'batch', None, 'batch', status='waiting')
+    assert store.claim_next('worker') is None
+
+
+def test_stale_running_jobs_are_requeued(docuvoice, store):
+    store.create('job', 'text', 'a.txt', 'text')
+    assert store.claim_next('crashed')['id'] == 'job'
+
+    # a live owner keeps its job
+    store.heartbeat('crashed')
+    assert store.claim_next('other') is None
+
+    store.update('job', heartbeat_at=time.time() - docuvoice.JOB_STALE_SECONDS - 1)
+    job = store.claim_next('other')
+    assert (job['id'], job['owner'], job['status']) == ('job', 'other', 'running')
+
@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.fixture
+def histogram(docuvoice):
+    """An unlabelled histogram, taken off /metrics again afterwards."""
+    metric = docuvoice.Histogram('docuvoice_test_seconds', 'Test durations', buckets=(0.1, 1))
+    yield metric
+    docuvoice.METRICS.remove(metric)
+
+
+def test_unlabelled_histogram_reports_zeros_then_observations(docuvoice, histogram):
+    assert list(histogram.render())[2:] == [
+        'docuvoice_test_seconds_bucket{le="0.1"} 0',
+        'docuvoice_test_seconds_bucket{le="1"} 0',
+        'docuvoice_test_seconds_bucket{le="+Inf"} 0',
+        'docuvoice_test_seconds_sum 0.0',
+        'docuvoice_test_seconds_count 0',
+    ]
+    histogram.observe(0.5)
+    histogram.observe(2.0)
+    assert list(histogram.render())[2:] == [
+        'docuvoice_test_seconds_bucket{le="0.1"} 0',
+        'docuvoice_test_seconds_bucket{le="1"} 1',
+        'docuvoice_test_seconds_bucket{le="+Inf"} 2',
+        'docuvoice_test_seconds_sum 2.5',
+        'docuvoice_test_seconds_count 2',
+    ]
+
+
+def test_metrics_endpoint_renders_every_metric(docuvoice, histogram):
+    histogram.observe(0.05)
+    response = docuvoice.app.test_client().get('/metrics')
+    assert response.status_code == 200
+    assert 'docuvoice_test_seconds_count 1' in response.get_data(as_text=True)
@@ -0,0 +1,53 @@
+import os
+import time
+import uuid
+
+import pytest
+
+
+def _text_job(docuvoice, text):
+    job_id = uuid.uuid4().hex
+    source = os.path.join(docuvoice.UPLOAD_FOLDER, f'{job_id}.txt')
+    with open(source, 'w', encoding='utf-8') as fh:
+        fh.write(text)
+    docuvoice.JOB_STORE.create(job_id, 'text', source, 'text_to_speech', {'engine': 'fake'})
+    # owned and fresh, so no worker thread takes it over while the test drives it
+    docuvoice.JOB_STORE.update(job_id, status='running', owner='tests', heartbeat_at=time.time())
+    return job_id, source
+
+
+def _playlist(client, job_id):
+    response = client.get(f'/job-playlist/{job_id}.m3u8')
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    return [line for line in lines if not line.startswith('#')], lines
+
+
+def test_running_playlist_reads_recorded_durations(docuvoice, monkeypatch):
+    job_id, _ = _text_job(docuvoice, 'unused')
+    os.makedirs(docuvoice._job_tmp_folder(job_id, 'text_to_speech'))
+    for idx, text in enumerate(['First part.', 'Second, longer part of the text.']):
+        docuvoice._synthesize_part(text, docuvoice._job_part_path(job_id, 'text_to_speech', idx, 'mp3'), engine='fake')
+
+    def fail(path):
+        raise AssertionError(f'{path} was parsed again')
+
+    monkeypatch.setattr(docuvoice, '_audio_duration', fail)
+    urls, lines = _playlist(docuvoice.app.test_client(), job_id)
+    assert urls == [f'/job-part/{job_id}/0', f'/job-part/{job_id}/1']
+    expected = [len(text) * 65 // 24 * 0.024 for text in ('First part.', 'Second, longer part of the text.')]
+    assert [float(line[8:-1]) for line in lines if line.startswith('#EXTINF:')] == pytest.approx(expected, abs=1e-3)
+    assert '#EXT-X-ENDLIST' not in lines
+
+
+def test_finished_job_drops_its_parts_and_lists_the_combined_file(docuvoice):
+    job_id, source = _text_job(docuvoice, 'One paragraph.\nAnother paragraph.\n')
+    docuvoice._start_background_conversion(job_id, source, 'text_to_speech', engine='fake', output_label='text_to_audio')
+    job = docuvoice.JOB_STORE.get(job_id)
+    assert job['status'] == 'done'
+    assert not os.path.exists(docuvoice._job_tmp_folder(job_id, 'text_to_speech'))
+
+    urls, lines = _playlist(docuvoice.app.test_client(), job_id)
+    with docuvoice.app.test_request_context():
+        assert urls == [docuvoice._audio_url(job['audio_path'])]
+    assert lines[-1] == '#EXT-X-ENDLIST'
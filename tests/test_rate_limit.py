@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+
+def test_rate_halves_on_throttling_and_creeps_back(docuvoice):
+    limiter = docuvoice.AdaptiveRateLimiter(10.0)
+    limiter.throttled()
+    assert limiter.rate == 5.0
+    # a burst of failures within one interval only counts once
+    limiter.throttled()
+    assert limiter.rate == 5.0
+    assert limiter.stats()['throttles'] == 2
+    for _ in range(10):
+        limiter.succeeded()
+    assert limiter.rate == pytest.approx(7.0)
+    for _ in range(100):
+        limiter.succeeded()
+    assert limiter.rate == 10.0
+
+
+def test_tokens_run_out_into_waits(docuvoice):
+    limiter = docuvoice.AdaptiveRateLimiter(2.0)
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(0.5, abs=0.05)
+    assert limiter.reserve() == pytest.approx(1.0, abs=0.05)
+
+
+@pytest.fixture
+def flaky(docuvoice):
+    class FlakyEngine(docuvoice.TTSEngine):
+        """Fails its first ``failures`` calls with ``error``."""
+
+        name = 'flaky'
+
+        def __init__(self, failures, error):
+            self.failures = failures
+            self.error = error
+            self.calls = 0
+
+        def synthesize(self, text, lang, out_path):
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise self.error
+
+        async def synthesize_async(self, text, lang, out_path):
+            self.synthesize(text, lang, out_path)
+
+    return FlakyEngine
+
+
+@pytest.fixture
+def no_backoff(docuvoice, monkeypatch):
+    monkeypatch.setattr(docuvoice, '_retry_delay', lambda attempt: 0)
+    limiter = docuvoice.AdaptiveRateLimiter(1000.0)
+    monkeypatch.setitem(docuvoice.TTS_LIMITERS, 'flaky', limiter)
+    return limiter
+
+
+def test_throttled_calls_are_retried_and_slow_the_limiter(docuvoice, flaky, no_backoff):
+    engine = flaky(2, docuvoice.TTSThrottled('429'))
+    docuvoice._synthesize_with_retries(engine, 'text', 'en', 'unused')
+    assert engine.calls == 3
+    assert no_backoff.stats()['throttles'] == 2
+    assert no_backoff.rate < 1000.0
+
+
+def test_retries_give_up_after_the_budget(docuvoice, flaky, no_backoff, monkeypatch):
+    monkeypatch.setattr(docuvoice, 'TTS_RETRIES', 2)
+    engine = flaky(10, docuvoice.TTSThrottled('429'))
+    with pytest.raises(docuvoice.TTSThrottled):
+        docuvoice._synthesize_with_retries(engine, 'text', 'en', 'unused')
+    assert engine.calls == 3
+
+
+def test_other_errors_are_not_retried(docuvoice, flaky, no_backoff):
+    engine = flaky(1, ValueError('bad input'))
+    with pytest.raises(ValueError):
+        docuvoice._synthesize_with_retries(engine, 'text', 'en', 'unused')
+    assert engine.calls == 1
+
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_waits_are_timed_apart_from_engine_calls(docuvoice, flaky, no_backoff, monkeypatch, use_async):
+    monkeypatch.setattr(docuvoice, '_retry_delay', lambda attempt: 0.05)
+    engine = flaky(1, docuvoice.TTSThrottled('429'))
+    timings = docuvoice.JobTimings()
+    if use_async:
+        asyncio.run(docuvoice._synthesize_with_retries_async(engine, 'text', 'en', 'unused', timings))
+    else:
+        docuvoice._synthesize_with_retries(engine, 'text', 'en', 'unused', timings)
+    stages = timings.summary()
+    assert stages['synthesize']['count'] == 2
+    assert stages['rate_limit_wait']['count'] == 2
+    assert stages['retry_backoff']['count'] == 1
+    assert stages['retry_backoff']['seconds'] >= 0.05
+    assert stages['synthesize']['seconds'] < 0.05
@@ -0,0 +1,97 @@
+import os
+import time
+import uuid
+
+
+def _tmp_folder(docuvoice, job_id, age):
+    path = docuvoice._job_tmp_folder(job_id, 'reaper_test')
+    os.makedirs(path)
+    with open(os.path.join(path, f'{job_id}_0.mp3'), 'wb') as fh:
+        fh.write(docuvoice.FakeEngine.FRAME)
+    then = time.time() - age
+    os.utime(path, (then, then))
+    return path
+
+
+def test_temp_folders_of_unfinished_jobs_are_kept(docuvoice, monkeypatch):
+    store = docuvoice.JOB_STORE
+    old = docuvoice.UPLOAD_GRACE_SECONDS + 60
+    running, failed, gone, fresh = (uuid.uuid4().hex for _ in range(4))
+    store.create(running, 'text', None, 'reaper_test')
+    store.update(running, status='running', owner='tests', heartbeat_at=time.time())
+    store.create(failed, 'text', None, 'reaper_test')
+    store.update(failed, status='error', progress=100)
+
+    paths = {
+        running: _tmp_folder(docuvoice, running, old),
+        failed: _tmp_folder(docuvoice, failed, old),
+        gone: _tmp_folder(docuvoice, gone, old),
+        fresh: _tmp_folder(docuvoice, fresh, 0),
+    }
+    # a job claimed after the reaper's snapshot of active jobs keeps its folder too
+    real_active = store.active
+    monkeypatch.setattr(store, 'active', lambda: {k: v for k, v in real_active().items() if k != running})
+    docuvoice._reap_once()
+
+    assert os.path.isdir(paths[running])
+    assert os.path.isdir(paths[fresh])
+    assert not os.path.exists(paths[failed])
+    assert not os.path.exists(paths[gone])
+
+
+def test_expired_jobs_and_stalled_batches_are_counted_apart(docuvoice):
+    store = docuvoice.JOB_STORE
+    done, batch = uuid.uuid4().hex, uuid.uuid4().hex
+    store.create(done, 'text', None, 'reaper_test')
+    store.update(done, status='done', progress=100)
+    store.create(batch, 'batch', None, 'batch', status='waiting')
+    long_ago = time.time() - docuvoice.JOB_TTL_SECONDS - 60
+    store._conn().execute('UPDATE jobs SET updated_at = ?, finished_at = ? WHERE id IN (?, ?)',
+                          (long_ago, long_ago, done, batch))
+    before = dict(docuvoice.REAPER_STATS)
+
+    docuvoice._reap_once()
+
+    assert store.get(done) is None
+    assert store.get(batch)['status'] == 'error'
+    assert docuvoice.REAPER_STATS['jobs_expired'] - before['jobs_expired'] == 1
+    assert docuvoice.REAPER_STATS['batches_failed'] - before['batches_failed'] == 1
+
+
+def test_library_entries_of_deleted_files_are_dropped(docuvoice):
+    os.makedirs(docuvoice.BATCH_FOLDER, exist_ok=True)
+    archive = os.path.join(docuvoice.BATCH_FOLDER, f'{uuid.uuid4().hex}.zip')
+    with open(archive, 'wb') as fh:
+        fh.write(b'PK')
+    long_ago = time.time() - docuvoice.JOB_TTL_SECONDS - 60
+    os.utime(archive, (long_ago, long_ago))
+    kept = os.path.join(docuvoice.AUDIO_FOLDER, 'reaper_test', f'{uuid.uuid4().hex}.mp3')
+    os.makedirs(os.path.dirname(kept), exist_ok=True)
+    with open(kept, 'wb') as fh:
+        fh.write(docuvoice.FakeEngine.FRAME)
+    deleted = kept.replace('.mp3', '_deleted.mp3')
+    # as an older backfill indexed them
+    for path, module in ((archive, 'batch'), (kept, 'reaper_test'), (deleted, 'reaper_test')):
+        docuvoice.LIBRARY.record(path, module, duration=1.0)
+
+    docuvoice._reap_once()
+
+    assert not os.path.exists(archive)
+    paths = {entry['path'] for entry in docuvoice.LIBRARY.page(per_page=1000)[0]}
+    assert os.path.normpath(kept) in paths
+    assert os.path.normpath(archive) not in paths
+    assert os.path.normpath(deleted) not in paths
+
+
+def test_backfill_only_indexes_audio(docuvoice, tmp_path):
+    audio_folder = tmp_path / 'audio'
+    (audio_folder / 'batch').mkdir(parents=True)
+    (audio_folder / 'batch' / 'batch_1.zip').write_bytes(b'PK')
+    (audio_folder / 'word_to_speech').mkdir()
+    (audio_folder / 'word_to_speech' / 'old.mp3').write_bytes(docuvoice.FakeEngine.FRAME)
+    (audio_folder / 'word_to_speech' / 'notes.txt').write_text('not audio')
+
+    library = docuvoice.LibraryIndex(str(tmp_path / 'library.db'), str(audio_folder))
+    entries, total = library.page()
+    assert total == 1
+    assert entries[0]['filename'] == 'old.mp3'
@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.fixture
+def client(docuvoice):
+    return docuvoice.app.test_client()
+
+
+@pytest.mark.parametrize('engine', ['fake', 'nonsense'])
+def test_unlisted_engines_are_rejected(docuvoice, client, monkeypatch, engine):
+    monkeypatch.setattr(docuvoice, 'TTS_DEFAULT_ENGINE', 'gtts')
+    response = client.post('/text-to-audio', data={'text': 'Hello', 'engine': engine})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == f'Unknown TTS engine: {engine}'
+
+
+def test_the_server_default_engine_may_be_requested(docuvoice, client):
+    assert docuvoice.TTS_DEFAULT_ENGINE == 'fake'
+    assert docuvoice.get_requested_tts_engine('fake').name == 'fake'
+    assert docuvoice.get_requested_tts_engine(None).name == 'fake'
+
+
+def test_stream_links_are_only_offered_for_text_and_word_jobs(docuvoice, client):
+    response = client.post('/text-to-audio', data={'text': 'Hello there.'}, headers={'Accept': 'application/json'})
+    assert response.status_code in (200, 202)
+    payload = response.get_json()
+    assert payload['stream_url'] == f"/job-stream/{payload['job_id']}"
+    assert payload['playlist_url'] == f"/job-playlist/{payload['job_id']}.m3u8"
+
+    docuvoice.JOB_STORE.create('batch-links', 'batch', None, 'batch', status='waiting')
+    with docuvoice.app.test_request_context(headers={'Accept': 'application/json'}):
+        response, status = docuvoice._job_started_response('batch-links')
+    assert status == 202
+    assert 'stream_url' not in response.get_json()
+    assert 'playlist_url' not in response.get_json()
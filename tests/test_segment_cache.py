@@ -0,0 +1,30 @@
+def _segment(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b'x' * size)
+    return str(path)
+
+
+def test_least_recently_used_segments_are_evicted(docuvoice, tmp_path):
+    cache = docuvoice.SegmentCache(str(tmp_path / 'cache'), 250, str(tmp_path / 'cache.db'))
+    for name in ('a', 'b', 'c'):
+        cache.store(name, _segment(tmp_path, name, 100))
+    # 'a' was evicted to make room for 'c'; using 'b' makes 'c' the next victim
+    assert not cache.fetch('a', str(tmp_path / 'out'))
+    assert cache.fetch('b', str(tmp_path / 'out'))
+    cache.store('d', _segment(tmp_path, 'd', 100))
+    assert cache.fetch('b', str(tmp_path / 'out'))
+    assert not cache.fetch('c', str(tmp_path / 'out'))
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes'], stats['evictions']) == (2, 200, 2)
+
+
+def test_processes_sharing_the_cache_share_its_cap(docuvoice, tmp_path):
+    # two instances stand in for two worker processes on the same folder and database
+    first = docuvoice.SegmentCache(str(tmp_path / 'cache'), 250, str(tmp_path / 'cache.db'))
+    second = docuvoice.SegmentCache(str(tmp_path / 'cache'), 250, str(tmp_path / 'cache.db'))
+    first.store('a', _segment(tmp_path, 'a', 100))
+    second.store('b', _segment(tmp_path, 'b', 100))
+    first.store('c', _segment(tmp_path, 'c', 100))
+    assert second.stats()['bytes'] == 200
+    assert sorted(p.name for p in (tmp_path / 'cache').iterdir()) == ['b.seg', 'c.seg']
+    assert second.fetch('c', str(tmp_path / 'out'))
@@ -0,0 +1,37 @@
+import os
+import time
+import uuid
+
+
+def _running_job(docuvoice, parts):
+    job_id = uuid.uuid4().hex
+    docuvoice.JOB_STORE.create(job_id, 'text', None, 'text_to_speech', {'engine': 'fake'})
+    # owned and fresh, so no worker thread takes it over while the test reads it
+    docuvoice.JOB_STORE.update(job_id, status='running', owner='tests', heartbeat_at=time.time())
+    os.makedirs(docuvoice._job_tmp_folder(job_id, 'text_to_speech'))
+    for idx, text in enumerate(parts):
+        docuvoice._synthesize_part(text, docuvoice._job_part_path(job_id, 'text_to_speech', idx, 'mp3'), engine='fake')
+    return job_id
+
+
+def test_event_stream_ends_with_a_reconnect_hint(docuvoice, monkeypatch):
+    monkeypatch.setattr(docuvoice, 'JOB_STREAM_MAX_SECONDS', 0.2)
+    job_id = _running_job(docuvoice, [])
+    started = time.monotonic()
+    body = docuvoice.app.test_client().get(f'/job-events/{job_id}').get_data(as_text=True)
+    assert time.monotonic() - started < 5
+    assert body.startswith(f'retry: {docuvoice.JOB_EVENTS_RETRY_MS}\n\n')
+    assert body.count('data: ') == 1
+
+
+def test_audio_stream_resumes_from_start_offset(docuvoice, monkeypatch):
+    monkeypatch.setattr(docuvoice, 'JOB_STREAM_MAX_SECONDS', 0.2)
+    frame = docuvoice.FakeEngine.FRAME
+    texts = ['First part.', 'Second, longer part of the text.']
+    total = sum(len(text) * 65 // 24 for text in texts)
+    job_id = _running_job(docuvoice, texts)
+    client = docuvoice.app.test_client()
+
+    assert client.get(f'/job-stream/{job_id}').get_data() == frame * total
+    # 35 frames of 24 ms have been played already
+    assert client.get(f'/job-stream/{job_id}?start=0.845').get_data() == frame * (total - 35)
@@ -0,0 +1,43 @@
+import hashlib
+import io
+import os
+
+from conftest import write_docx
+
+
+def _spools(docuvoice):
+    return [name for name in os.listdir(docuvoice.UPLOAD_FOLDER) if name.startswith('.upload_')]
+
+
+def _post(docuvoice, data, filename='doc.docx'):
+    return docuvoice.app.test_client().post(
+        '/word-to-audio', data={'file': (io.BytesIO(data), filename)},
+        headers={'Accept': 'application/json'}, content_type='multipart/form-data',
+    )
+
+
+def test_non_zip_documents_are_refused_from_their_first_bytes(docuvoice):
+    response = _post(docuvoice, b'%PDF-1.7 not a document' * 100)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'The uploaded file is not a valid .docx document'
+    assert _spools(docuvoice) == []
+
+
+def test_oversized_uploads_are_cut_off_while_spooling(docuvoice, monkeypatch):
+    # the request-wide cap stays high, so the spool's own count has to catch it
+    monkeypatch.setattr(docuvoice, 'MAX_UPLOAD_BYTES', 1000)
+    response = _post(docuvoice, docuvoice.DOCX_MAGIC + bytes(5000))
+    assert response.status_code == 413
+    assert _spools(docuvoice) == []
+
+
+def test_spooled_upload_is_hashed_and_moved_into_place(docuvoice, tmp_path):
+    path = write_docx(str(tmp_path / 'doc.docx'), '<w:p><w:r><w:t>Spooled upload.</w:t></w:r></w:p>')
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    response = _post(docuvoice, data)
+    assert response.status_code in (200, 202)
+    job = docuvoice.JOB_STORE.get(response.get_json()['job_id'])
+    params = {'chunk_chars': docuvoice.TTS_CHUNK_CHARS, 'engine': 'fake', 'source_name': 'doc.docx'}
+    assert job['source_hash'] == docuvoice._source_hash(hashlib.sha256(data).hexdigest(), 'word', params)
+    assert _spools(docuvoice) == []
@@ -0,0 +1,53 @@
+import io
+import wave
+
+
+def _recording():
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(8000)
+        out.writeframes(bytes(16000))
+    data = buf.getvalue()
+    return [data[i:i + 6000] for i in range(0, len(data), 6000)]
+
+
+def test_chunks_resume_after_a_gap_and_finalize_once(docuvoice):
+    client = docuvoice.app.test_client()
+    chunks = _recording()
+    session = client.post('/voice-upload').get_json()
+    upload = f"/voice-upload/{session['upload_id']}"
+
+    assert client.put(f'{upload}/0', data=chunks[0]).get_json()['next_index'] == 1
+    # a retried chunk whose response was lost is not appended twice
+    assert client.put(f'{upload}/0', data=chunks[0]).get_json()['size'] == len(chunks[0])
+    missing = client.put(f'{upload}/2', data=chunks[2])
+    assert missing.status_code == 409
+    assert missing.get_json()['next_index'] == 1
+
+    # after a dropped connection the recorder asks where to continue
+    assert client.get(upload).get_json()['next_index'] == 1
+    for index in range(1, len(chunks)):
+        assert client.put(f'{upload}/{index}', data=chunks[index]).status_code == 200
+
+    assert client.get(f'{upload}/audio').get_data() == b''.join(chunks)
+
+    first = client.post(f'{upload}/finalize', headers={'Accept': 'application/json'})
+    assert first.status_code in (200, 202)
+    job_id = first.get_json()['job_id']
+    status = client.get(upload).get_json()
+    assert (status['job_id'], status['size']) == (job_id, len(b''.join(chunks)))
+    # finalizing again (a retry) answers with the same job instead of queueing another
+    assert client.post(f'{upload}/finalize', headers={'Accept': 'application/json'}).get_json()['job_id'] == job_id
+    late = client.put(f'{upload}/{len(chunks)}', data=b'more')
+    assert (late.status_code, late.get_json()['message']) == (409, 'Upload already finalized')
+
+
+def test_recordings_in_unknown_formats_are_not_queued(docuvoice):
+    client = docuvoice.app.test_client()
+    upload = f"/voice-upload/{client.post('/voice-upload').get_json()['upload_id']}"
+    client.put(f'{upload}/0', data=b'not audio at all')
+    response = client.post(f'{upload}/finalize', headers={'Accept': 'application/json'})
+    assert response.status_code == 400
+    assert client.get(upload).get_json()['job_id'] is None
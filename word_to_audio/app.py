@@ -1,11 +1,33 @@
-from flask import Flask, render_template, request, send_from_directory, redirect, url_for, jsonify
+from flask import Flask, Request, Response, g, render_template, request, send_file, send_from_directory, redirect, url_for, jsonify, stream_with_context
 import threading
+import contextlib
+import hashlib
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import uuid
 import time
 import os
+import json
+import random
+import re
 import socket
+import sqlite3
+import subprocess
+import wave
+import zipfile
+import array
+import asyncio
+import base64
+import urllib.request
+import xml.etree.ElementTree as ET
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
 from gtts import gTTS
-from docx import Document
+from gtts.tts import gTTSError
+import requests
+from requests.adapters import HTTPAdapter
 import datetime
 
 # Optional: zeroconf (mDNS) announcer so the app can be discovered as a .local name on the LAN
@@ -22,6 +44,13 @@ try:
 except Exception:
     PYDUB_AVAILABLE = False
 
+# Optional: aiohttp lets the asyncio synthesis engine call gTTS without a thread per request
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except Exception:
+    AIOHTTP_AVAILABLE = False
+
 app = Flask(__name__)
 
 
@@ -41,168 +70,2538 @@ app.config['AUDIO_FOLDER'] = AUDIO_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(AUDIO_FOLDER, exist_ok=True)
 
-# Simple in-memory job store for background conversions
-JOBS = {}
-JOBS_LOCK = threading.Lock()
+
+
+def _env_int(name, default):
+    """Read an integer setting from the environment, falling back to ``default``."""
+    try:
+        return int(os.environ.get(name, default))
+    except Exception:
+        return default
+
+
+# In-process metrics, rendered in the Prometheus text format by /metrics.
+# Under gunicorn each worker process keeps and reports its own numbers.
+METRICS = []
+# seconds; from a cached 5 ms part up to a multi-minute document
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _prom_labels(pairs):
+    """Render ``[(name, value), ...]`` as a Prometheus label set."""
+    if not pairs:
+        return ''
+
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in pairs) + '}'
+
+
+def _prom_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, one value per combination of label values."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.lock = threading.Lock()
+        # unlabelled metrics report 0 before anything happens
+        self.values = {} if labels else {(): 0}
+        METRICS.append(self)
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} {self.kind}'
+        with self.lock:
+            items = sorted(self.values.items())
+        for label_values, value in items:
+            yield f'{self.name}{_prom_labels(list(zip(self.labels, label_values)))} {_prom_value(value)}'
+
+
+class Gauge(Counter):
+    """Value that goes up and down, e.g. busy workers."""
+
+    kind = 'gauge'
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Counter):
+    """Cumulative-bucket histogram of observed values (durations, mostly)."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=STAGE_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        if not labels:
+            self.values = {(): self._empty()}
+
+    def _empty(self):
+        # [count per bucket..., +Inf count, sum]
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value, *label_values):
+        with self.lock:
+            counts = self.values.setdefault(label_values, self._empty())
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        with self.lock:
+            items = sorted((k, list(v)) for k, v in self.values.items())
+        for label_values, counts in items:
+            pairs = list(zip(self.labels, label_values))
+            for bound, count in zip(self.buckets, counts):
+                yield f'{self.name}_bucket{_prom_labels(pairs + [("le", bound)])} {count}'
+            yield f'{self.name}_bucket{_prom_labels(pairs + [("le", "+Inf")])} {counts[-2]}'
+            yield f'{self.name}_sum{_prom_labels(pairs)} {_prom_value(counts[-1])}'
+            yield f'{self.name}_count{_prom_labels(pairs)} {counts[-2]}'
+
+
+STAGE_SECONDS = Histogram('docuvoice_stage_seconds', 'Time spent in each stage of a job', ('stage',))
+JOB_SECONDS = Histogram('docuvoice_job_seconds', 'Wall-clock time of a job run', ('kind', 'status'))
+JOBS_FINISHED = Counter('docuvoice_jobs_finished_total', 'Job runs finished by this process', ('kind', 'status'))
+JOB_WORKERS_BUSY = Gauge('docuvoice_job_workers_busy', 'Job worker threads currently running a job')
+TTS_ASYNC_IN_FLIGHT = Gauge('docuvoice_tts_async_in_flight', 'Synthesis calls running on the asyncio engine')
+TTS_RETRIES_TOTAL = Counter('docuvoice_tts_retries_total', 'Synthesis calls retried after a transient error',
+                            ('engine', 'reason'))
+HTTP_SECONDS = Histogram('docuvoice_http_request_duration_seconds',
+                         'Time to produce a response, by route (streamed bodies not included)',
+                         ('method', 'endpoint', 'status'), HTTP_BUCKETS)
+
+
+class JobTimings:
+    """Per-stage totals for one job run; every measurement also feeds STAGE_SECONDS."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+
+    def add(self, name, seconds):
+        STAGE_SECONDS.observe(seconds, name)
+        with self.lock:
+            total, count = self.stages.get(name, (0.0, 0))
+            self.stages[name] = (total + seconds, count + 1)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def iterate(self, name, iterable):
+        """Yield from ``iterable``, timing only the work done producing the items."""
+        spent = 0.0
+        iterator = iter(iterable)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    spent += time.perf_counter() - start
+                yield item
+        finally:
+            self.add(name, spent)
+
+    def summary(self):
+        with self.lock:
+            return {name: {'seconds': round(total, 4), 'count': count}
+                    for name, (total, count) in self.stages.items()}
+
+
+def _stage(timings, name):
+    """``timings.stage(name)``, or nothing for calls made outside a job."""
+    return timings.stage(name) if timings is not None else contextlib.nullcontext()
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        HTTP_SECONDS.observe(time.perf_counter() - started, request.method, request.endpoint or 'unmatched',
+                             str(response.status_code))
+    return response
+
+
+# Maximum number of paragraphs synthesized concurrently for a single job
+TTS_WORKERS = max(1, _env_int('DOCUVOICE_TTS_WORKERS', 4))
+# Target number of characters per synthesized part; short paragraphs are merged
+# up to this size and longer ones are split at sentence boundaries
+TTS_CHUNK_CHARS = max(100, _env_int('DOCUVOICE_CHUNK_CHARS', 1000))
+
+# On-disk cache of synthesized segments, capped at DOCUVOICE_TTS_CACHE_MB
+TTS_CACHE_FOLDER = os.path.join(AUDIO_FOLDER, '_tts_cache')
+TTS_CACHE_MAX_BYTES = max(0, _env_int('DOCUVOICE_TTS_CACHE_MB', 512)) * 1024 * 1024
+
+
+# Upper bound for one call to an offline engine's command line tool
+TTS_SUBPROCESS_TIMEOUT = 300
+# Run synthesis for engines that support it on one asyncio event loop, with at
+# most DOCUVOICE_TTS_ASYNC_CONCURRENCY calls in flight across all jobs
+TTS_ASYNC = _env_int('DOCUVOICE_TTS_ASYNC', 1) != 0
+TTS_ASYNC_CONCURRENCY = max(1, _env_int('DOCUVOICE_TTS_ASYNC_CONCURRENCY', 64))
+# Offline engines use the CPU and memory of this machine, so fewer of their calls may run at once
+TTS_LOCAL_CONCURRENCY = max(1, _env_int('DOCUVOICE_TTS_LOCAL_CONCURRENCY', os.cpu_count() or 1))
+# Attempts after the first before a part (and so its job) fails, with jittered
+# exponential backoff starting at DOCUVOICE_TTS_RETRY_BASE_MS
+TTS_RETRIES = max(0, _env_int('DOCUVOICE_TTS_RETRIES', 5))
+TTS_RETRY_BASE_SECONDS = max(1, _env_int('DOCUVOICE_TTS_RETRY_BASE_MS', 1000)) / 1000.0
+TTS_RETRY_MAX_SECONDS = 60
+
+
+def _write_file(path, data):
+    with open(path, 'wb') as fh:
+        fh.write(data)
+
+
+async def _run_tool_async(args, text):
+    """Run an engine's command line tool without tying up a thread; raises like ``subprocess.run(check=True)``."""
+    proc = await asyncio.create_subprocess_exec(
+        *args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(text.encode('utf-8')), TTS_SUBPROCESS_TIMEOUT)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(args, TTS_SUBPROCESS_TIMEOUT)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, args, stdout, stderr)
+
+
+class TTSThrottled(Exception):
+    """The backend refused a request because of its rate limit."""
+
+
+class AdaptiveRateLimiter:
+    """Token bucket shared by every job in the process, for one TTS backend.
+
+    The rate starts at ``rate`` requests per second. It is halved when the
+    backend throttles us and creeps back up with each success (AIMD), so it
+    settles just under whatever the backend currently allows.
+    """
+
+    # halve at most once per this many seconds, so one burst of failures counts once
+    DECREASE_INTERVAL = 1.0
+
+    def __init__(self, rate, min_rate=None):
+        self.max_rate = rate
+        self.min_rate = min_rate or rate / 32
+        self.rate = rate
+        self.burst = max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.last_decrease = 0.0
+        self.lock = threading.Lock()
+        self.throttles = 0
+        self.waited = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token and return how many seconds to wait before using it.
+
+        Never blocks, so callers can sleep however suits them
+        (``time.sleep`` or ``asyncio.sleep``).
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.waited += delay
+            return delay
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    def succeeded(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 50)
+
+    def throttled(self):
+        with self.lock:
+            now = time.monotonic()
+            self.throttles += 1
+            if now - self.last_decrease < self.DECREASE_INTERVAL:
+                return
+            self.last_decrease = now
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            # drop the saved-up burst so queued callers back off too
+            self.tokens = min(self.tokens, 0.0)
+
+    def stats(self):
+        with self.lock:
+            return {'rate': self.rate, 'max_rate': self.max_rate, 'throttles': self.throttles,
+                    'waited_seconds': self.waited}
+
+
+class TTSEngine:
+    """Interface for speech synthesis backends.
+
+    ``synthesize`` writes audio for ``text`` to ``out_path`` in the engine's
+    ``extension`` format. Engines must be safe to call from several threads.
+    """
+
+    name = None
+    extension = 'mp3'
+    # whether the engine is offered in the web forms
+    listed = True
+    # requests per minute allowed to start, across all jobs; 0 for no limit
+    rate_per_min = 0
+    # most calls the asyncio engine runs at once for this engine, below TTS_ASYNC_CONCURRENCY; None for no cap
+    max_concurrency = None
+
+    def available(self):
+        return True
+
+    def synthesize(self, text, lang, out_path):
+        raise NotImplementedError
+
+    def supports_async(self):
+        """Whether ``synthesize_async`` can be used instead of a thread per call."""
+        return False
+
+    async def synthesize_async(self, text, lang, out_path):
+        raise NotImplementedError
+
+    def error_kind(self, error):
+        """'throttled' or 'transient' if a failed call is worth retrying, else None."""
+        if isinstance(error, TTSThrottled):
+            return 'throttled'
+        return None
+
+
+class PooledGTTS(gTTS):
+    """gTTS that sends its requests through a shared keep-alive ``session``.
+
+    Stock gTTS opens a new session, and so a new TCP+TLS connection, for every
+    request; this reuses pooled connections across parts and jobs instead.
+    """
+
+    # the audio of each response line, base64 encoded
+    AUDIO_RE = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+    def __init__(self, text, lang, session, timeout):
+        super().__init__(text=text, lang=lang)
+        self.session = session
+        self.request_timeout = timeout
+
+    def _audio(self, line, response):
+        """Audio carried by one response line, or None if the line has none."""
+        if 'jQ1olc' not in line:
+            return None
+        audio = self.AUDIO_RE.search(line)
+        if not audio:
+            # no audio in a successful response, e.g. an unsupported language
+            raise gTTSError(tts=self, response=response)
+        return base64.b64decode(audio.group(1).encode('ascii'))
+
+    def stream(self):
+        for pr in self._prepare_requests():
+            try:
+                r = self.session.send(pr, proxies=urllib.request.getproxies(), timeout=self.request_timeout)
+                r.raise_for_status()
+            except requests.exceptions.HTTPError:
+                raise gTTSError(tts=self, response=r)
+            except requests.exceptions.RequestException:
+                raise gTTSError(tts=self)
+            # read the whole body so the connection goes back to the pool
+            with r:
+                for line in r.iter_lines(chunk_size=1024):
+                    audio = self._audio(line.decode('utf-8'), r)
+                    if audio is not None:
+                        yield audio
+
+    async def fetch_async(self, client):
+        """The whole audio, fetched with the aiohttp ``client`` session."""
+        data = bytearray()
+        for pr in self._prepare_requests():
+            try:
+                async with client.request(pr.method, pr.url, data=pr.body, headers=dict(pr.headers)) as r:
+                    body = await r.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                raise gTTSError(tts=self)
+            # gTTSError and error_kind() read status_code and reason like on a requests response
+            response = requests.Response()
+            response.status_code, response.reason = r.status, r.reason
+            if r.status >= 400:
+                raise gTTSError(tts=self, response=response)
+            for line in body.splitlines():
+                audio = self._audio(line, response)
+                if audio is not None:
+                    data += audio
+        return bytes(data)
+
+
+class GTTSEngine(TTSEngine):
+    """Google Translate text-to-speech (needs network access).
+
+    Requests share one pooled HTTP session per process, holding up to
+    DOCUVOICE_GTTS_POOL_SIZE keep-alive connections (0 turns pooling off).
+    This applies to both the threaded and the asyncio path.
+    """
+
+    name = 'gtts'
+
+    def __init__(self):
+        self.rate_per_min = max(0, _env_int('DOCUVOICE_GTTS_RATE_PER_MIN', 300))
+        self.timeout = max(1, _env_int('DOCUVOICE_GTTS_TIMEOUT', 30))
+        self._session = None
+        self._session_lock = threading.Lock()
+        # aiohttp session of the asyncio engine, only touched from its event loop
+        self._client = None
+
+    @staticmethod
+    def pool_size(default):
+        """DOCUVOICE_GTTS_POOL_SIZE, or ``default`` (enough for every concurrent request) when unset."""
+        return max(0, _env_int('DOCUVOICE_GTTS_POOL_SIZE', default))
+
+    def session(self):
+        """The shared session, created on first use; None when pooling is off."""
+        with self._session_lock:
+            if self._session is None:
+                # by default enough connections for every synthesis thread of every job
+                pool_size = self.pool_size(TTS_WORKERS * JOB_WORKERS)
+                if not pool_size:
+                    return None
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+
+    def synthesize(self, text, lang, out_path):
+        session = self.session()
+        if session is None:
+            gTTS(text=text, lang=lang).save(out_path)
+        else:
+            PooledGTTS(text, lang, session, self.timeout).save(out_path)
+
+    def supports_async(self):
+        return AIOHTTP_AVAILABLE
+
+    async def synthesize_async(self, text, lang, out_path):
+        if self._client is None:
+            # by default one connection per request the engine lets run at once;
+            # with pooling off every request gets a fresh connection, as in the threaded path
+            pool_size = self.pool_size(TTS_ASYNC_CONCURRENCY)
+            if pool_size:
+                connector = aiohttp.TCPConnector(limit=pool_size)
+            else:
+                connector = aiohttp.TCPConnector(limit=TTS_ASYNC_CONCURRENCY, force_close=True)
+            self._client = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trust_env=True,
+            )
+        data = await PooledGTTS(text, lang, None, self.timeout).fetch_async(self._client)
+        await asyncio.get_running_loop().run_in_executor(None, _write_file, out_path, data)
+
+    def error_kind(self, error):
+        if not isinstance(error, gTTSError):
+            return super().error_kind(error)
+        status = error.rsp.status_code if error.rsp is not None else None
+        # no response at all is a timeout or refused connection: back off like a 429
+        if status is None or status == 429:
+            return 'throttled'
+        if status >= 500:
+            return 'transient'
+        return None
+
+
+class EspeakEngine(TTSEngine):
+    """Offline synthesis through the espeak-ng command line tool."""
+
+    name = 'espeak'
+    extension = 'wav'
+    max_concurrency = TTS_LOCAL_CONCURRENCY
+
+    def __init__(self):
+        self.binary = os.environ.get('DOCUVOICE_ESPEAK_BIN', 'espeak-ng')
+
+    def available(self):
+        return shutil.which(self.binary) is not None
+
+    def synthesize(self, text, lang, out_path):
+        subprocess.run(
+            [self.binary, '-v', lang, '-w', out_path, '--stdin'],
+            input=text.encode('utf-8'), check=True, capture_output=True, timeout=TTS_SUBPROCESS_TIMEOUT,
+        )
+
+    def supports_async(self):
+        return True
+
+    async def synthesize_async(self, text, lang, out_path):
+        await _run_tool_async([self.binary, '-v', lang, '-w', out_path, '--stdin'], text)
+
+
+class PiperEngine(TTSEngine):
+    """Offline neural synthesis through the Piper command line tool.
+
+    The voice is fixed by the model in DOCUVOICE_PIPER_MODEL, so ``lang`` is ignored.
+    """
+
+    name = 'piper'
+    extension = 'wav'
+    # each call is a process that loads the voice model
+    max_concurrency = TTS_LOCAL_CONCURRENCY
+
+    def __init__(self):
+        self.binary = os.environ.get('DOCUVOICE_PIPER_BIN', 'piper')
+        self.model = os.environ.get('DOCUVOICE_PIPER_MODEL', '')
+
+    def available(self):
+        return bool(self.model) and os.path.exists(self.model) and shutil.which(self.binary) is not None
+
+    def synthesize(self, text, lang, out_path):
+        subprocess.run(
+            [self.binary, '--model', self.model, '--output_file', out_path],
+            input=text.encode('utf-8'), check=True, capture_output=True, timeout=TTS_SUBPROCESS_TIMEOUT,
+        )
+
+    def supports_async(self):
+        return True
+
+    async def synthesize_async(self, text, lang, out_path):
+        await _run_tool_async([self.binary, '--model', self.model, '--output_file', out_path], text)
+
+
+class FakeEngine(TTSEngine):
+    """Deterministic engine that writes silent MP3 frames, for tests and benchmarks.
+
+    The output length grows with the text (about 65 ms per character) and each
+    call waits DOCUVOICE_FAKE_TTS_LATENCY_MS to stand in for network latency.
+    DOCUVOICE_FAKE_TTS_THROTTLE_PERCENT of the calls fail with TTSThrottled,
+    to exercise the rate limiter and retries.
+    """
+
+    name = 'fake'
+    listed = False
+    # MPEG 2 Layer III, 32 kbit/s, 24 kHz, mono; 96 bytes / 24 ms per frame
+    FRAME = b'\xff\xf3\x44\xc4' + bytes(92)
+
+    def __init__(self):
+        self.latency = max(0, _env_int('DOCUVOICE_FAKE_TTS_LATENCY_MS', 0)) / 1000.0
+        self.throttle_percent = max(0, _env_int('DOCUVOICE_FAKE_TTS_THROTTLE_PERCENT', 0))
+        self.rate_per_min = max(0, _env_int('DOCUVOICE_FAKE_TTS_RATE_PER_MIN', 0))
+
+    def synthesize(self, text, lang, out_path):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.throttle_percent and random.random() * 100 < self.throttle_percent:
+            raise TTSThrottled('429 (Too Many Requests) from fake TTS')
+        _write_file(out_path, self._frames(text))
+
+    def _frames(self, text):
+        return self.FRAME * max(1, (len(text) * 65) // 24)
+
+    def supports_async(self):
+        return True
+
+    async def synthesize_async(self, text, lang, out_path):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.throttle_percent and random.random() * 100 < self.throttle_percent:
+            raise TTSThrottled('429 (Too Many Requests) from fake TTS')
+        await asyncio.get_running_loop().run_in_executor(None, _write_file, out_path, self._frames(text))
+
+
+TTS_ENGINES = {engine.name: engine for engine in (GTTSEngine(), EspeakEngine(), PiperEngine(), FakeEngine())}
+TTS_LIMITERS = {name: AdaptiveRateLimiter(engine.rate_per_min / 60.0)
+                for name, engine in TTS_ENGINES.items() if engine.rate_per_min}
+# Engine used when a request doesn't pick one
+TTS_DEFAULT_ENGINE = os.environ.get('DOCUVOICE_TTS_ENGINE', 'gtts')
+
+
+def get_tts_engine(name=None):
+    """Return the named engine (or the default); raises ValueError if it can't be used."""
+    name = name or TTS_DEFAULT_ENGINE
+    engine = TTS_ENGINES.get(name)
+    if engine is None:
+        raise ValueError(f'Unknown TTS engine: {name}')
+    if not engine.available():
+        raise ValueError(f'TTS engine {name} is not available on this server')
+    return engine
+
+
+def get_requested_tts_engine(name=None):
+    """Like get_tts_engine, for a name sent by a client.
+
+    Clients may only pick engines the forms offer; unlisted ones (such as
+    fake) are reachable only by making them the server default.
+    """
+    engine = TTS_ENGINES.get(name) if name else None
+    if name and name != TTS_DEFAULT_ENGINE and (engine is None or not engine.listed):
+        raise ValueError(f'Unknown TTS engine: {name}')
+    return get_tts_engine(name)
+
+
+def _listed_tts_engines():
+    """Names of the engines the forms should offer, default first."""
+    names = [name for name, engine in TTS_ENGINES.items() if engine.listed and engine.available()]
+    names.sort(key=lambda name: name != TTS_DEFAULT_ENGINE)
+    return names
+
+
+# Persistent job store for background conversions. Jobs are queued in SQLite and
+# picked up by a fixed pool of DOCUVOICE_JOB_WORKERS threads, so a restart does
+# not lose in-flight work and a burst of uploads does not spawn a thread each.
+JOBS_DB = os.environ.get('DOCUVOICE_JOBS_DB', 'docuvoice_jobs.db')
+JOB_WORKERS = max(1, _env_int('DOCUVOICE_JOB_WORKERS', 2))
+# Running jobs whose owner has not sent a heartbeat for this long are requeued
+JOB_HEARTBEAT_SECONDS = 10
+JOB_STALE_SECONDS = max(JOB_HEARTBEAT_SECONDS * 3, _env_int('DOCUVOICE_JOB_STALE_SECONDS', 60))
+JOB_FINISHED_STATES = ('done', 'error')
+# Finished jobs are forgotten after DOCUVOICE_JOB_TTL seconds; the reaper runs every DOCUVOICE_REAP_INTERVAL
+JOB_TTL_SECONDS = max(60, _env_int('DOCUVOICE_JOB_TTL', 24 * 3600))
+REAP_INTERVAL_SECONDS = max(10, _env_int('DOCUVOICE_REAP_INTERVAL', 600))
+# Uploads younger than this may belong to a request that hasn't queued its job yet
+UPLOAD_GRACE_SECONDS = 600
+
+
+class _SQLiteStore:
+    """Base for the SQLite-backed stores: one connection per thread, WAL mode."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        # sqlite3 connections can't be shared between threads, so keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _add_columns(self, table, columns):
+        """Add ``(name, declaration)`` columns that an older database is missing."""
+        existing = {row['name'] for row in self._conn().execute(f'PRAGMA table_info({table})')}
+        for name, decl in columns:
+            if name not in existing:
+                try:
+                    self._conn().execute(f'ALTER TABLE {table} ADD COLUMN {name} {decl}')
+                except sqlite3.OperationalError as e:
+                    # another worker process migrated the table first
+                    if 'duplicate column' not in str(e):
+                        raise
+
+
+class JobStore(_SQLiteStore):
+    """SQLite-backed job table shared by the web handlers and the worker pool."""
+
+    COLUMNS = (
+        'id', 'kind', 'status', 'progress', 'message', 'detail', 'audio_path',
+        'source_path', 'module_name', 'params', 'owner', 'heartbeat_at',
+        'created_at', 'updated_at', 'finished_at', 'total_parts', 'source_hash', 'timings', 'parent_id',
+    )
+    JSON_COLUMNS = ('params', 'timings')
+    # columns added after the first release, created on startup if an older database lacks them
+    ADDED_COLUMNS = (
+        ('total_parts', 'INTEGER'),
+        ('source_hash', 'TEXT'),
+        ('timings', 'TEXT'),
+        ('parent_id', 'TEXT'),
+    )
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._conn().execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress INTEGER NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                detail TEXT NOT NULL DEFAULT '',
+                audio_path TEXT,
+                source_path TEXT,
+                module_name TEXT,
+                params TEXT NOT NULL DEFAULT '{}',
+                owner TEXT,
+                heartbeat_at REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                finished_at REAL
+            )"""
+        )
+        self._add_columns('jobs', self.ADDED_COLUMNS)
+        self._conn().execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)')
+        self._conn().execute('CREATE INDEX IF NOT EXISTS jobs_source_hash ON jobs (source_hash, status)')
+        self._conn().execute('CREATE INDEX IF NOT EXISTS jobs_parent ON jobs (parent_id, status)')
+
+    @staticmethod
+    def _row(row):
+        if row is None:
+            return None
+        job = dict(row)
+        for name in JobStore.JSON_COLUMNS:
+            job[name] = json.loads(job[name] or '{}')
+        return job
+
+    def create(self, job_id, kind, source_path, module_name, params=None, status='pending', message='Queued',
+               source_hash=None, parent_id=None):
+        now = time.time()
+        self._conn().execute(
+            'INSERT INTO jobs (id, kind, status, message, source_path, module_name, params, source_hash, '
+            'parent_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (job_id, kind, status, message, source_path, module_name, json.dumps(params or {}), source_hash,
+             parent_id, now, now),
+        )
+        return self.get(job_id)
+
+    def create_or_attach(self, job_id, kind, source_path, module_name, params, source_hash):
+        """Create a job unless one with the same ``source_hash`` is still queued or running.
+
+        Returns the job that will produce the audio: the existing one when
+        there is a match, otherwise the newly created one.
+        """
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE source_hash = ? AND status IN ('pending', 'running') "
+                "ORDER BY created_at LIMIT 1",
+                (source_hash,),
+            ).fetchone()
+            if row is None:
+                job = self.create(job_id, kind, source_path, module_name, params, source_hash=source_hash)
+            else:
+                job = self.get(row['id'])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return job
+
+    def get(self, job_id):
+        return self._row(self._conn().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+
+    def update(self, job_id, **fields):
+        unknown = set(fields) - set(self.COLUMNS)
+        if unknown:
+            raise ValueError(f'Unknown job fields: {sorted(unknown)}')
+        now = time.time()
+        fields['updated_at'] = now
+        for name in self.JSON_COLUMNS:
+            if name in fields:
+                fields[name] = json.dumps(fields[name])
+        if fields.get('status') in JOB_FINISHED_STATES:
+            fields['finished_at'] = now
+            fields['owner'] = None
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        self._conn().execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+
+    def claim_next(self, owner):
+        """Atomically move the oldest queued job to ``running`` for ``owner``.
+
+        Jobs left ``running`` by a process that stopped sending heartbeats are
+        put back in the queue first, so work interrupted by a crash resumes.
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'pending', owner = NULL, message = 'Resuming', updated_at = ? "
+                "WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (now, now - JOB_STALE_SECONDS),
+            )
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'pending' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, heartbeat_at = ?, updated_at = ? WHERE id = ?",
+                    (owner, now, now, row['id']),
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return self.get(row['id']) if row is not None else None
+
+    def heartbeat(self, owner):
+        self._conn().execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'",
+            (time.time(), owner),
+        )
+
+    def expire_finished(self, before):
+        """Delete finished jobs older than ``before``; returns the number removed."""
+        placeholders = ', '.join('?' for _ in JOB_FINISHED_STATES)
+        cur = self._conn().execute(
+            f'DELETE FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?',
+            (*JOB_FINISHED_STATES, before),
+        )
+        return cur.rowcount
+
+    def fail_stale_batches(self, before):
+        """Fail batches still gathering documents with no activity since ``before``.
+
+        A batch only leaves 'preparing' or 'waiting' through its children, so
+        one whose request died half-way or whose children were lost would wait
+        forever; failing it lets it expire like any other finished job.
+        """
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = 'error', message = 'The batch stopped making progress', "
+            "updated_at = ?, finished_at = ? "
+            "WHERE kind = 'batch' AND status IN ('preparing', 'waiting') AND updated_at < ? "
+            "AND NOT EXISTS (SELECT 1 FROM jobs c WHERE c.parent_id = jobs.id AND c.updated_at >= ?)",
+            (now, now, before, before),
+        )
+        return cur.rowcount
+
+    def active(self):
+        """Return ``{job_id: source_path}`` for jobs that are queued or running."""
+        rows = self._conn().execute(
+            "SELECT id, source_path FROM jobs WHERE status IN ('pending', 'running')"
+        ).fetchall()
+        return {r['id']: r['source_path'] for r in rows}
+
+    def children(self, parent_id):
+        rows = self._conn().execute(
+            'SELECT * FROM jobs WHERE parent_id = ? ORDER BY created_at, rowid', (parent_id,)
+        ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def children_summary(self, parent_id):
+        """Return ``{status: (count, summed progress)}`` for the children of a batch."""
+        rows = self._conn().execute(
+            'SELECT status, COUNT(*) AS n, SUM(progress) AS progress FROM jobs WHERE parent_id = ? GROUP BY status',
+            (parent_id,),
+        ).fetchall()
+        return {r['status']: (r['n'], r['progress'] or 0) for r in rows}
+
+    def release_batch(self, parent_id):
+        """Queue a waiting batch once all its children have finished; True if this call did it."""
+        placeholders = ', '.join('?' for _ in JOB_FINISHED_STATES)
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = 'pending', progress = 95, message = 'Packing archive', updated_at = ? "
+            "WHERE id = ? AND status = 'waiting' AND NOT EXISTS ("
+            f"SELECT 1 FROM jobs WHERE parent_id = ? AND status NOT IN ({placeholders}))",
+            (time.time(), parent_id, parent_id, *JOB_FINISHED_STATES),
+        )
+        return cur.rowcount == 1
+
+    def parent_of(self, job_id):
+        row = self._conn().execute('SELECT parent_id FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return row['parent_id'] if row is not None else None
+
+    def counts(self):
+        """Return ``{status: number of jobs}``."""
+        rows = self._conn().execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status').fetchall()
+        return {r['status']: r['n'] for r in rows}
+
+    def list(self, limit=200):
+        rows = self._conn().execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,)).fetchall()
+        return [self._row(r) for r in rows]
+
+
+JOB_STORE = JobStore(JOBS_DB)
+
+
+class SegmentCache(_SQLiteStore):
+    """Content-addressed store of synthesized audio segments with LRU eviction.
+
+    Entries are keyed by a hash of (text, lang, engine) so that re-uploads of a
+    revised document only synthesize the paragraphs that actually changed.
+    Sizes and last-use times live in SQLite rather than in memory, so every
+    worker process (and the CPU pool's children) enforces one shared cap.
+    """
+
+    def __init__(self, folder, max_bytes, db_path):
+        super().__init__(db_path)
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(folder, exist_ok=True)
+        conn = self._conn()
+        created = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tts_segments'"
+        ).fetchone() is None
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS tts_segments (
+                key TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                used_at REAL NOT NULL
+            )"""
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS tts_segments_used ON tts_segments (used_at)')
+        if created:
+            self._backfill()
+
+    def _backfill(self):
+        """Index segments left on disk by a version that kept the index in memory."""
+        rows = []
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            if not name.endswith('.seg') or not os.path.isfile(path):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            rows.append((name[:-4], st.st_size, st.st_mtime))
+        self._conn().executemany('INSERT OR IGNORE INTO tts_segments (key, size, used_at) VALUES (?, ?, ?)', rows)
+        self._evict()
+
+    @staticmethod
+    def key(text, lang, engine):
+        return hashlib.sha256(f"{engine}\0{lang}\0{text}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        # segments keep whatever format their engine produced, so no audio extension
+        return os.path.join(self.folder, f"{key}.seg")
+
+    def fetch(self, key, dest):
+        """Copy a cached segment to ``dest``; return False on a miss."""
+        try:
+            shutil.copyfile(self._path(key), dest)
+        except OSError:
+            with self.lock:
+                self.misses += 1
+            return False
+        # a no-op if another process evicted it meanwhile; the copy is still good
+        self._conn().execute('UPDATE tts_segments SET used_at = ? WHERE key = ?', (time.time(), key))
+        with self.lock:
+            self.hits += 1
+        return True
+
+    def store(self, key, src):
+        """Add the segment at ``src`` to the cache and evict old entries if needed."""
+        if self.max_bytes <= 0:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            shutil.copyfile(src, tmp_path)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._conn().execute(
+            'INSERT INTO tts_segments (key, size, used_at) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET size = excluded.size, used_at = excluded.used_at',
+            (key, size, time.time()),
+        )
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used segments until the whole cache fits in ``max_bytes``."""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM tts_segments').fetchone()[0]
+            victims = []
+            if total > self.max_bytes:
+                for row in conn.execute('SELECT key, size FROM tts_segments ORDER BY used_at'):
+                    victims.append(row['key'])
+                    total -= row['size']
+                    if total <= self.max_bytes:
+                        break
+                conn.executemany('DELETE FROM tts_segments WHERE key = ?', [(key,) for key in victims])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        for key in victims:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+        if victims:
+            with self.lock:
+                self.evictions += len(victims)
+
+    def stats(self):
+        entries, size = self._conn().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tts_segments'
+        ).fetchone()
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+TTS_CACHE = SegmentCache(TTS_CACHE_FOLDER, TTS_CACHE_MAX_BYTES, JOBS_DB)
+
+
+class UploadSessionStore(_SQLiteStore):
+    """Resumable uploads: numbered chunks appended in order to one file in uploads/.
+
+    Kept next to the jobs table so every worker process sees the same sessions.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._conn().execute(
+            """CREATE TABLE IF NOT EXISTS upload_sessions (
+                id TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                next_index INTEGER NOT NULL DEFAULT 0,
+                size INTEGER NOT NULL DEFAULT 0,
+                job_id TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+
+    def create(self, session_id, path):
+        now = time.time()
+        open(path, 'wb').close()
+        self._conn().execute(
+            'INSERT INTO upload_sessions (id, path, created_at, updated_at) VALUES (?, ?, ?, ?)',
+            (session_id, path, now, now),
+        )
+        return self.get(session_id)
+
+    def get(self, session_id):
+        row = self._conn().execute('SELECT * FROM upload_sessions WHERE id = ?', (session_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def append(self, session_id, index, data):
+        """Append chunk ``index`` if it is the next one expected; returns False otherwise.
+
+        The file is cut back to the recorded size first, so bytes left by a
+        chunk whose request broke off halfway are overwritten by its retry.
+        """
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT path, size FROM upload_sessions WHERE id = ? AND next_index = ? AND job_id IS NULL',
+                (session_id, index),
+            ).fetchone()
+            if row is not None:
+                with open(row['path'], 'r+b') as fh:
+                    fh.truncate(row['size'])
+                    fh.seek(row['size'])
+                    fh.write(data)
+                conn.execute(
+                    'UPDATE upload_sessions SET next_index = next_index + 1, size = size + ?, updated_at = ? '
+                    'WHERE id = ?',
+                    (len(data), time.time(), session_id),
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return row is not None
+
+    def finalize(self, session_id, job_id):
+        """Hand the session over to ``job_id``; False if it was already finalized."""
+        cur = self._conn().execute(
+            'UPDATE upload_sessions SET job_id = ?, updated_at = ? WHERE id = ? AND job_id IS NULL',
+            (job_id, time.time(), session_id),
+        )
+        return cur.rowcount == 1
+
+    def open_paths(self):
+        """Files of sessions still receiving chunks."""
+        rows = self._conn().execute('SELECT path FROM upload_sessions WHERE job_id IS NULL').fetchall()
+        return {r['path'] for r in rows}
+
+    def expire(self, before):
+        """Forget sessions untouched since ``before``; returns the number removed."""
+        return self._conn().execute('DELETE FROM upload_sessions WHERE updated_at < ?', (before,)).rowcount
+
+
+UPLOAD_SESSIONS = UploadSessionStore(JOBS_DB)
+
+
+# Metadata index of generated audio, so the library can be listed without walking audio_files/
+LIBRARY_DB = os.environ.get('DOCUVOICE_LIBRARY_DB', 'docuvoice_library.db')
+
+
+class LibraryIndex(_SQLiteStore):
+    """SQLite index of every generated or saved audio file."""
+
+    ADDED_COLUMNS = (
+        ('source_hash', 'TEXT'),
+    )
+    # what the backfill indexes; batch archives and other files in the audio folder are left out
+    AUDIO_EXTENSIONS = ('.mp3', '.wav', '.ogg', '.opus', '.webm', '.m4a')
+
+    def __init__(self, path, audio_folder):
+        super().__init__(path)
+        conn = self._conn()
+        created = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'library'"
+        ).fetchone() is None
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS library (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL UNIQUE,
+                module TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                source_name TEXT,
+                job_id TEXT,
+                duration REAL,
+                size INTEGER NOT NULL DEFAULT 0,
+                engine TEXT,
+                created_at REAL NOT NULL
+            )"""
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS library_created ON library (created_at)')
+        conn.execute('CREATE INDEX IF NOT EXISTS library_module ON library (module, created_at)')
+        self._add_columns('library', self.ADDED_COLUMNS)
+        conn.execute('CREATE INDEX IF NOT EXISTS library_source_hash ON library (source_hash)')
+        if created:
+            self._backfill(audio_folder)
+
+    def _backfill(self, audio_folder):
+        """Index files generated before the index existed (runs once, on a new database)."""
+        for module in os.listdir(audio_folder):
+            module_folder = os.path.join(audio_folder, module)
+            if module.startswith(('.', '_')) or not os.path.isdir(module_folder):
+                continue
+            for name in os.listdir(module_folder):
+                path = os.path.join(module_folder, name)
+                if name.lower().endswith(self.AUDIO_EXTENSIONS) and os.path.isfile(path):
+                    self.record(path, module, created_at=os.path.getmtime(path))
+
+    def record(self, path, module, source_name=None, job_id=None, engine=None, created_at=None, source_hash=None,
+               duration=None):
+        """Add or refresh the entry for ``path``; ``duration`` is measured from the file if not given."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        try:
+            duration = round(duration if duration is not None else _audio_duration(path), 3)
+        except Exception:
+            # e.g. browser recordings in containers we can't parse without decoding
+            duration = None
+        self._conn().execute(
+            'INSERT INTO library (path, module, filename, source_name, job_id, duration, size, engine, created_at, '
+            'source_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (path) DO UPDATE SET source_name = COALESCE(excluded.source_name, source_name), '
+            'job_id = COALESCE(excluded.job_id, job_id), engine = COALESCE(excluded.engine, engine), '
+            'source_hash = COALESCE(excluded.source_hash, source_hash), '
+            'duration = excluded.duration, size = excluded.size',
+            (os.path.normpath(path), module, os.path.basename(path), source_name, job_id, duration, size,
+             engine, created_at or time.time(), source_hash),
+        )
+
+    def prune_missing(self):
+        """Drop entries whose file no longer exists; returns the number removed."""
+        conn = self._conn()
+        gone = [(row['id'],) for row in conn.execute('SELECT id, path FROM library') if not os.path.isfile(row['path'])]
+        conn.executemany('DELETE FROM library WHERE id = ?', gone)
+        return len(gone)
+
+    def duration(self, path):
+        """Duration recorded for ``path`` in seconds, or None if it isn't indexed or wasn't measured."""
+        row = self._conn().execute(
+            'SELECT duration FROM library WHERE path = ?', (os.path.normpath(path),)
+        ).fetchone()
+        return row['duration'] if row is not None else None
+
+    def find_by_hash(self, source_hash):
+        """Return the newest entry produced from ``source_hash`` whose file still exists."""
+        rows = self._conn().execute(
+            'SELECT * FROM library WHERE source_hash = ? ORDER BY created_at DESC', (source_hash,)
+        ).fetchall()
+        for row in rows:
+            if os.path.isfile(row['path']):
+                return dict(row)
+        return None
+
+    def page(self, page=1, per_page=20, module=None):
+        """Return ``(entries, total)`` for one page of the library, newest first."""
+        where, args = ('WHERE module = ?', (module,)) if module else ('', ())
+        conn = self._conn()
+        total = conn.execute(f'SELECT COUNT(*) FROM library {where}', args).fetchone()[0]
+        rows = conn.execute(
+            f'SELECT * FROM library {where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?',
+            (*args, per_page, (page - 1) * per_page),
+        ).fetchall()
+        return [dict(r) for r in rows], total
+
+
+# Identifies the jobs this process is running, for heartbeats and crash recovery
+JOB_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+JOB_QUEUE_COND = threading.Condition()
+_JOB_THREADS = []
+_JOB_THREADS_LOCK = threading.Lock()
+# Bumped on every update so /job-events streams wake up as soon as a job changes
+JOB_EVENTS = threading.Condition()
+_JOB_EVENT_SEQ = {}
+
+
+def _update_job(job_id, **fields):
+    JOB_STORE.update(job_id, **fields)
+    with JOB_EVENTS:
+        _JOB_EVENT_SEQ[job_id] = _JOB_EVENT_SEQ.get(job_id, 0) + 1
+        if fields.get('status') in JOB_FINISHED_STATES:
+            # finished jobs get no more updates; waiters compare against the missing key
+            _JOB_EVENT_SEQ.pop(job_id, None)
+        JOB_EVENTS.notify_all()
+    if fields.get('status') in JOB_FINISHED_STATES:
+        parent_id = JOB_STORE.parent_of(job_id)
+        if parent_id:
+            _release_batch(parent_id)
+
+
+def _release_batch(parent_id):
+    """Queue the archive step of a batch if all of its documents are finished."""
+    if JOB_STORE.release_batch(parent_id):
+        with JOB_QUEUE_COND:
+            JOB_QUEUE_COND.notify()
+
+
+def _audio_url(audio_path):
+    """URL of a generated file under AUDIO_FOLDER, or None if it isn't servable."""
+    if not audio_path:
+        return None
+    rel = os.path.relpath(os.path.abspath(audio_path), os.path.abspath(AUDIO_FOLDER))
+    parts = rel.split(os.sep)
+    if len(parts) != 2 or parts[0].startswith(('.', '_')):
+        return None
+    return url_for('serve_audio', module=parts[0], filename=parts[1])
+
+
+def _peaks_url(audio_path):
+    """URL of the waveform peaks of a recording, or None if none were written."""
+    if _audio_url(audio_path) is None or not os.path.exists(_peaks_path(audio_path)):
+        return None
+    return url_for('serve_peaks', module=os.path.basename(os.path.dirname(audio_path)),
+                   filename=os.path.basename(audio_path))
+
+
+def _job_payload(job):
+    """Public view of a job as returned by /job-status and /job-events."""
+    if not job:
+        return {'status': 'notfound', 'message': 'Job not found or expired', 'progress': 0}
+    payload = {
+        'status': job.get('status'),
+        'progress': job.get('progress', 0),
+        'message': job.get('message', ''),
+        'detail': job.get('detail', '')
+    }
+    if job.get('status') == 'done':
+        payload['audio_url'] = _audio_url(job.get('audio_path'))
+        if job.get('kind') == 'voice':
+            payload['peaks_url'] = _peaks_url(job.get('audio_path'))
+    if job.get('kind') == 'batch':
+        payload.update(_batch_payload(job))
+    return payload
+
+
+def _batch_payload(job):
+    """Aggregate progress of a batch, read from its child jobs."""
+    summary = JOB_STORE.children_summary(job['id'])
+    total = sum(n for n, _ in summary.values())
+    done = summary.get('done', (0, 0))[0]
+    failed = summary.get('error', (0, 0))[0]
+    extra = {'documents': {'total': total, 'done': done, 'error': failed}}
+    if job.get('status') in ('preparing', 'waiting'):
+        # children report 0..100 each; the archive step takes the batch from 95 to 100
+        progress = sum(p for _, p in summary.values()) / max(1, total)
+        extra.update(
+            status='running',
+            progress=int(progress * 0.95),
+            message=f'Converted {done + failed}/{total} documents',
+            detail=f'{done + failed}/{total}',
+        )
+    elif job.get('status') in ('pending', 'running'):
+        # released for packing; never report less than the documents reached
+        extra['progress'] = max(95, job.get('progress') or 0)
+    if job.get('status') == 'done':
+        extra['archive_url'] = _audio_url(job.get('audio_path'))
+    return extra
+
+
+def _remove_upload(path):
+    try:
+        if path and os.path.exists(path):
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def _enqueue_job(kind, source_path, module_name, params=None, source_hash=None, job_id=None, parent_id=None):
+    """Queue a background job and wake an idle worker; returns the job id.
+
+    With a ``source_hash``, a queued or running job for the same document and
+    settings is reused instead, and the duplicate upload is discarded. Jobs
+    that belong to a batch (``parent_id``) always get their own job.
+    """
+    job_id = job_id or uuid.uuid4().hex
+    if source_hash is None or parent_id is not None:
+        JOB_STORE.create(job_id, kind, source_path, module_name, params, source_hash=source_hash,
+                         parent_id=parent_id)
+    else:
+        job = JOB_STORE.create_or_attach(job_id, kind, source_path, module_name, params, source_hash)
+        if job['id'] != job_id:
+            app.logger.info(f"Attached duplicate upload to running job {job['id']}")
+            _remove_upload(source_path)
+            return job['id']
+    _start_job_workers()
+    with JOB_QUEUE_COND:
+        JOB_QUEUE_COND.notify()
+    return job_id
+
+
+# Output file label per job kind, e.g. word_to_speech_word_to_audio_<timestamp>.mp3
+JOB_OUTPUT_LABELS = {'word': 'word_to_audio', 'text': 'text_to_audio'}
+
+
+def _run_job(job):
+    if job['kind'] in JOB_OUTPUT_LABELS:
+        _start_background_conversion(
+            job['id'], job['source_path'], job['module_name'],
+            chunk_chars=job['params'].get('chunk_chars', TTS_CHUNK_CHARS),
+            engine=job['params'].get('engine'),
+            output_label=JOB_OUTPUT_LABELS[job['kind']],
+            source_name=job['params'].get('source_name'),
+            source_hash=job.get('source_hash'),
+        )
+    elif job['kind'] == 'voice':
+        _transcode_voice(job['id'], job['source_path'], job['module_name'], job['params'].get('container'))
+    elif job['kind'] == 'batch':
+        _build_batch_archive(job['id'])
+    else:
+        _update_job(job['id'], status='error', message=f"Unknown job kind: {job['kind']}", progress=100)
+
+
+def _job_worker_loop():
+    while True:
+        try:
+            job = JOB_STORE.claim_next(JOB_OWNER)
+        except Exception as e:
+            app.logger.warning(f"Job worker could not claim a job: {e}")
+            job = None
+        if job is None:
+            # also poll, so jobs queued by another process or requeued after a crash are found
+            with JOB_QUEUE_COND:
+                JOB_QUEUE_COND.wait(timeout=2)
+            continue
+        app.logger.info(f"Worker picked up job {job['id']} ({job['kind']})")
+        JOB_WORKERS_BUSY.inc()
+        started = time.perf_counter()
+        try:
+            _run_job(job)
+        except Exception as e:
+            app.logger.exception(f"Job {job['id']} crashed")
+            _update_job(job['id'], status='error', message=f'Error: {str(e)}', progress=100)
+        finally:
+            JOB_WORKERS_BUSY.dec()
+        finished = JOB_STORE.get(job['id'])
+        status = finished['status'] if finished else 'unknown'
+        JOB_SECONDS.observe(time.perf_counter() - started, job['kind'], status)
+        JOBS_FINISHED.inc(job['kind'], status)
+
+
+def _job_heartbeat_loop():
+    while True:
+        time.sleep(JOB_HEARTBEAT_SECONDS)
+        try:
+            JOB_STORE.heartbeat(JOB_OWNER)
+        except Exception as e:
+            app.logger.warning(f"Job heartbeat failed: {e}")
+
+
+REAPER_STATS = {
+    'runs': 0,
+    'jobs_expired': 0,
+    'batches_failed': 0,
+    'tmp_dirs_removed': 0,
+    'uploads_removed': 0,
+    'archives_removed': 0,
+    'library_entries_removed': 0,
+    'bytes_reclaimed': 0,
+    'last_run_at': None,
+    'last_error': None,
+}
+REAPER_LOCK = threading.Lock()
+
+
+def _path_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _reap_once():
+    """Expire old finished jobs and delete temp folders and uploads nobody owns."""
+    now = time.time()
+    batches_failed = JOB_STORE.fail_stale_batches(now - JOB_TTL_SECONDS)
+    expired = JOB_STORE.expire_finished(now - JOB_TTL_SECONDS)
+    active = JOB_STORE.active()
+    # recordings still being uploaded are kept until their session expires
+    UPLOAD_SESSIONS.expire(now - JOB_TTL_SECONDS)
+    active_sources = {os.path.abspath(p) for p in [*active.values(), *UPLOAD_SESSIONS.open_paths()] if p}
+    tmp_removed = uploads_removed = archives_removed = reclaimed = 0
+
+    # tmp_<job_id> part folders left behind by jobs that failed or no longer exist
+    for module in os.listdir(AUDIO_FOLDER):
+        module_folder = os.path.join(AUDIO_FOLDER, module)
+        if not os.path.isdir(module_folder):
+            continue
+        for name in os.listdir(module_folder):
+            path = os.path.join(module_folder, name)
+            if not name.startswith('tmp_') or not os.path.isdir(path) or name[4:] in active:
+                continue
+            # the snapshot above may predate the job being claimed, so check it again
+            job = JOB_STORE.get(name[4:])
+            if job is not None and job['status'] not in JOB_FINISHED_STATES:
+                continue
+            try:
+                if now - os.path.getmtime(path) < UPLOAD_GRACE_SECONDS:
+                    continue
+            except OSError:
+                continue
+            size = _path_size(path)
+            shutil.rmtree(path, ignore_errors=True)
+            if not os.path.exists(path):
+                tmp_removed += 1
+                reclaimed += size
+
+    # uploads that no queued or running job or open upload session is going to read
+    for name in os.listdir(UPLOAD_FOLDER):
+        path = os.path.join(UPLOAD_FOLDER, name)
+        try:
+            if not os.path.isfile(path) or now - os.path.getmtime(path) < UPLOAD_GRACE_SECONDS:
+                continue
+            if os.path.abspath(path) in active_sources:
+                continue
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            continue
+        uploads_removed += 1
+        reclaimed += size
+
+    # batch archives are only linked from their job, so they go when it expires
+    if os.path.isdir(BATCH_FOLDER):
+        for name in os.listdir(BATCH_FOLDER):
+            path = os.path.join(BATCH_FOLDER, name)
+            try:
+                if not os.path.isfile(path) or now - os.path.getmtime(path) < JOB_TTL_SECONDS:
+                    continue
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            archives_removed += 1
+            reclaimed += size
+
+    # entries of files deleted above (older backfills indexed batch archives too) or by hand
+    library_removed = LIBRARY.prune_missing()
+
+    with REAPER_LOCK:
+        REAPER_STATS['runs'] += 1
+        REAPER_STATS['jobs_expired'] += expired
+        REAPER_STATS['batches_failed'] += batches_failed
+        REAPER_STATS['tmp_dirs_removed'] += tmp_removed
+        REAPER_STATS['uploads_removed'] += uploads_removed
+        REAPER_STATS['archives_removed'] += archives_removed
+        REAPER_STATS['library_entries_removed'] += library_removed
+        REAPER_STATS['bytes_reclaimed'] += reclaimed
+        REAPER_STATS['last_run_at'] = now
+    if expired or batches_failed or tmp_removed or uploads_removed or archives_removed or library_removed:
+        app.logger.info(
+            f"Reaper expired {expired} jobs, failed {batches_failed} stalled batches, removed {tmp_removed} "
+            f"temp folders, {uploads_removed} uploads and {archives_removed} batch archives ({reclaimed} bytes), "
+            f"and {library_removed} library entries of missing files"
+        )
+
+
+def _reaper_loop():
+    while True:
+        try:
+            _reap_once()
+        except Exception as e:
+            with REAPER_LOCK:
+                REAPER_STATS['last_error'] = str(e)
+            app.logger.warning(f"Reaper run failed: {e}")
+        time.sleep(REAP_INTERVAL_SECONDS)
+
+
+def _start_job_workers():
+    """Start the fixed-size worker pool and its housekeeping threads (once per process)."""
+    with _JOB_THREADS_LOCK:
+        if _JOB_THREADS:
+            return
+        _JOB_THREADS.append(threading.Thread(target=_job_heartbeat_loop, name='job-heartbeat', daemon=True))
+        _JOB_THREADS.append(threading.Thread(target=_reaper_loop, name='job-reaper', daemon=True))
+        for i in range(JOB_WORKERS):
+            _JOB_THREADS.append(threading.Thread(target=_job_worker_loop, name=f'job-worker-{i}', daemon=True))
+        for t in _JOB_THREADS:
+            t.start()
+
+
+@app.before_request
+def _ensure_job_workers():
+    # picks up jobs left over from a previous run even before anything new is uploaded
+    if not _JOB_THREADS:
+        _start_job_workers()
+
+
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+# elements whose runs still belong to the paragraph's own text
+_RUN_CONTAINERS = (f'{_W_NS}hyperlink', f'{_W_NS}ins', f'{_W_NS}smartTag')
+
+
+def _docx_main_part(zf):
+    """Return the zip member holding the document body (normally word/document.xml)."""
+    try:
+        with zf.open('_rels/.rels') as fh:
+            for rel in ET.parse(fh).getroot().iter(f'{_REL_NS}Relationship'):
+                if rel.get('Type') == _OFFICE_DOCUMENT_REL:
+                    return rel.get('Target', '').lstrip('/')
+    except KeyError:
+        pass
+    return 'word/document.xml'
+
+
+def _paragraph_runs(parent):
+    """Runs of a paragraph, skipping those nested in drawings, text boxes and alternate content."""
+    for child in parent:
+        if child.tag == f'{_W_NS}r':
+            yield child
+        elif child.tag in _RUN_CONTAINERS:
+            yield from _paragraph_runs(child)
+
+
+def iter_docx_paragraphs(word_file):
+    """Yield the text of each body paragraph of a .docx file as it is parsed.
+
+    ``word/document.xml`` is read incrementally from the zip, and every
+    paragraph is discarded once yielded, so memory use does not grow with the
+    document. The text of a paragraph matches python-docx's ``Paragraph.text``.
+    """
+    with zipfile.ZipFile(word_file) as zf:
+        with zf.open(_docx_main_part(zf)) as fh:
+            depth = 0
+            body = None
+            for event, elem in ET.iterparse(fh, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 2 and elem.tag == f'{_W_NS}body':
+                        body = elem
+                    continue
+                depth -= 1
+                # only direct children of <w:body>; tables and text boxes are nested deeper
+                if depth != 2 or body is None:
+                    continue
+                if elem.tag == f'{_W_NS}p':
+                    chunks = []
+                    for run in _paragraph_runs(elem):
+                        for child in run:
+                            if child.tag == f'{_W_NS}t':
+                                chunks.append(child.text or '')
+                            elif child.tag == f'{_W_NS}tab':
+                                chunks.append('\t')
+                            elif child.tag in (f'{_W_NS}br', f'{_W_NS}cr'):
+                                chunks.append('\n')
+                    yield ''.join(chunks)
+                body.clear()
+
 
 def convert_word_to_text(word_file):
     """Convert Word file content to text."""
-    doc = Document(word_file)
-    text = ""
-    for para in doc.paragraphs:
-        text += para.text + "\n"
-    return text
-
-def convert_text_to_audio(text, module_name):
-    """Convert text to audio and save it as an MP3 file with a timestamp."""
-    tts = gTTS(text=text, lang='en')
+    return "".join(para + "\n" for para in iter_docx_paragraphs(word_file))
+
+
+def _iter_source_paragraphs(source_file):
+    """Yield paragraphs from a queued job's source: a .docx upload or saved plain text."""
+    if source_file.lower().endswith('.txt'):
+        with open(source_file, encoding='utf-8') as fh:
+            for line in fh:
+                yield line.rstrip('\n')
+    else:
+        yield from iter_docx_paragraphs(source_file)
+
+
+def _extract_parts_to_file(source_file, out_path, chunk_chars):
+    """Process pool task: append the parts of a source document to ``out_path``, one JSON string per line.
+
+    Stops early once ``out_path`` is removed, which is how the reading job
+    says it no longer wants the parts. Returns the number of parts written.
+    """
+    written = 0
+    with open(out_path, 'a', encoding='utf-8') as fh:
+        for part in chunk_text_parts(_iter_source_paragraphs(source_file), chunk_chars):
+            if not os.path.exists(out_path):
+                break
+            fh.write(json.dumps(part) + '\n')
+            # the job reads the file while it grows, so hand each part over at once
+            fh.flush()
+            written += 1
+    return written
+
+
+def _iter_source_parts(source_file, chunk_chars, work_folder):
+    """Yield the parts of a job's source, parsed and cut in the CPU process pool.
+
+    The worker process writes parts to ``parts.jsonl`` in ``work_folder`` and
+    this generator follows the file, so synthesis still starts before the
+    document is fully read. Without a pool the work happens in this thread.
+    """
+    pool = _cpu_pool()
+    if pool is None:
+        yield from chunk_text_parts(_iter_source_paragraphs(source_file), chunk_chars)
+        return
+    path = os.path.join(work_folder, 'parts.jsonl')
+    open(path, 'w').close()
+    future = _submit_cpu(pool, _extract_parts_to_file, source_file, path, chunk_chars)
+    try:
+        with open(path, encoding='utf-8') as fh:
+            pending = ''
+            while True:
+                # checked before reading: once the task is done, reaching EOF means everything was read
+                finished = future.done()
+                line = fh.readline()
+                if line:
+                    pending += line
+                    if pending.endswith('\n'):
+                        yield json.loads(pending)
+                        pending = ''
+                    continue
+                if finished:
+                    _cpu_result(pool, future)
+                    return
+                time.sleep(0.02)
+    finally:
+        # the job stopped reading (error or cancellation): drop a task still
+        # queued, and removing the file tells a running one to stop
+        future.cancel()
+        _remove_upload(path)
+
+
+def _output_filename(module_name, label, extension, token=None):
+    """Timestamped output name; the short token keeps files made in the same second apart."""
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    audio_filename = f"{module_name}_text_to_audio_{timestamp}.mp3"
+    return f"{module_name}_{label}_{timestamp}_{(token or uuid.uuid4().hex)[:8]}.{extension}"
+
+
+def convert_text_to_audio(text, module_name, engine=None):
+    """Convert text to audio and save it as an audio file with a timestamp."""
+    engine = get_tts_engine(engine)
+    audio_filename = _output_filename(module_name, 'text_to_audio', engine.extension)
     
     # Create subfolder for the module if not exists
     module_folder = os.path.join(AUDIO_FOLDER, module_name)
     os.makedirs(module_folder, exist_ok=True)
     
     audio_path = os.path.join(module_folder, audio_filename)
-    tts.save(audio_path)  # Save the audio file with timestamp
+    _synthesize_part(text, audio_path, engine=engine.name)  # Save the audio file with timestamp
+    LIBRARY.record(audio_path, module_name, engine=engine.name)
     return audio_path
 
 
-def _start_background_conversion(job_id, word_file, module_name):
-    """Background worker that converts a Word file to audio and updates JOBS progress."""
+# MPEG audio frame tables, indexed by the header's version / layer bits.
+# version bits: 0 = MPEG 2.5, 2 = MPEG 2, 3 = MPEG 1; layer bits: 1 = III, 2 = II, 3 = I
+_MP3_BITRATES = {
+    (3, 3): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (3, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (3, 1): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 3): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 1): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _mp3_frame_header(data, pos):
+    """Parse the MPEG audio frame header at ``data[pos:]``.
+
+    Returns a dict describing the frame, or None if there is no valid header.
+    """
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_idx = (b2 >> 4) & 0x0F
+    rate_idx = (b2 >> 2) & 0x03
+    if version == 1 or layer == 0 or bitrate_idx in (0, 15) or rate_idx == 3:
+        return None
+    bitrate = _MP3_BITRATES[(3 if version == 3 else 2, layer)][bitrate_idx] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_idx]
+    padding = (b2 >> 1) & 0x01
+    mono = ((b3 >> 6) & 0x03) == 3
+    if layer == 3:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 1 and version != 3:
+        samples = 576
+        length = 72 * bitrate // sample_rate + padding
+    else:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    # size of the Layer III side info that precedes a Xing/Info tag
+    if version == 3:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    return {
+        'version': version,
+        'layer': layer,
+        'bitrate': bitrate,
+        'bitrate_idx': bitrate_idx,
+        'sample_rate': sample_rate,
+        'mono': mono,
+        'samples': samples,
+        'length': length,
+        'side_info': side_info,
+    }
+
+
+def _mp3_format_key(header):
+    """Frames can be appended to each other only when these fields agree."""
+    return (header['version'], header['layer'], header['sample_rate'], header['mono'])
+
+
+def _iter_mp3_frames(data):
+    """Yield ``(offset, header)`` for every audio frame in an MP3 byte string.
+
+    ID3v2/ID3v1 tags and Xing/Info/VBRI header frames are skipped, and garbage
+    between frames is resynchronised over, so only playable frames are returned.
+    gTTS writes one MP3 stream per 100-character request back to back, so tags
+    and headers may appear in the middle of a file as well as at the start.
+    """
+    pos = 0
+    end = len(data)
+    while pos < end:
+        if data[pos:pos + 3] == b'ID3' and pos + 10 <= end:
+            size = 0
+            for b in data[pos + 6:pos + 10]:
+                size = (size << 7) | (b & 0x7F)
+            footer = 10 if data[pos + 5] & 0x10 else 0
+            pos += 10 + size + footer
+            continue
+        if data[pos:pos + 3] == b'TAG' and end - pos >= 128:
+            pos += 128
+            continue
+        header = _mp3_frame_header(data, pos)
+        if header is None or pos + header['length'] > end:
+            pos += 1
+            continue
+        nxt = pos + header['length']
+        # a false sync inside tag or frame data rarely lines up with another frame
+        if nxt < end and data[nxt:nxt + 3] not in (b'ID3', b'TAG'):
+            following = _mp3_frame_header(data, nxt)
+            if following is None or _mp3_format_key(following) != _mp3_format_key(header):
+                pos += 1
+                continue
+        tag_at = pos + 4 + header['side_info']
+        if data[tag_at:tag_at + 4] in (b'Xing', b'Info') or data[pos + 36:pos + 40] == b'VBRI':
+            pos = nxt
+            continue
+        yield pos, header
+        pos = nxt
+
+
+def _mp3_xing_frame(header, frames, total_bytes, vbr):
+    """Build a Xing/Info frame that records the frame and byte count of a stream."""
+    needed = 4 + header['side_info'] + 16
+    bitrates = _MP3_BITRATES[(3 if header['version'] == 3 else 2, header['layer'])]
+    for bitrate_idx in range(max(1, header['bitrate_idx']), 15):
+        length = (72 if header['version'] != 3 else 144) * bitrates[bitrate_idx] * 1000 // header['sample_rate']
+        if length >= needed:
+            break
+    frame = bytearray(length)
+    frame[0] = 0xFF
+    frame[1] = 0xE0 | (header['version'] << 3) | (header['layer'] << 1) | 0x01
+    frame[2] = (bitrate_idx << 4) | (_MP3_SAMPLE_RATES[header['version']].index(header['sample_rate']) << 2)
+    frame[3] = 0xC0 if header['mono'] else 0x00
+    tag_at = 4 + header['side_info']
+    frame[tag_at:tag_at + 4] = b'Xing' if vbr else b'Info'
+    frame[tag_at + 4:tag_at + 8] = (0x03).to_bytes(4, 'big')  # frames + bytes fields present
+    frame[tag_at + 8:tag_at + 12] = frames.to_bytes(4, 'big')
+    frame[tag_at + 12:tag_at + 16] = (total_bytes + length).to_bytes(4, 'big')
+    return bytes(frame)
+
+
+def _transcode_mp3_part(part_file, reference):
+    """Re-encode a part with pydub so its frames match the ``reference`` header."""
+    if not PYDUB_AVAILABLE:
+        raise RuntimeError(f'{os.path.basename(part_file)} does not match the other parts and pydub is not available')
+    seg = AudioSegment.from_file(part_file, format='mp3')
+    seg = seg.set_frame_rate(reference['sample_rate']).set_channels(1 if reference['mono'] else 2)
+    tmp_path = f"{part_file}.{uuid.uuid4().hex}.mp3"
     try:
-        # Read document and split into parts to allow incremental progress
-        with JOBS_LOCK:
-            JOBS[job_id]['progress'] = 3
-            JOBS[job_id]['message'] = 'Reading document'
+        seg.export(tmp_path, format='mp3', bitrate=f"{reference['bitrate'] // 1000}k")
+        with open(tmp_path, 'rb') as fh:
+            return fh.read()
+    finally:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
 
-        text = convert_word_to_text(word_file)
 
-        # split into paragraphs (non-empty lines)
-        parts = [p.strip() for p in text.splitlines() if p.strip()]
-        if not parts:
-            parts = [text.strip()]
+def _concat_mp3_parts(part_files, out_path):
+    """Concatenate MP3 parts into ``out_path`` by appending their encoded frames.
+
+    Tags and per-part Xing headers are dropped and a single header describing the
+    whole output is written in front, so nothing is decoded or re-encoded. Only
+    parts whose sample rate / channel layout differ from the first part are
+    transcoded through pydub. Returns the duration of the output in seconds.
+    """
+    if not part_files:
+        raise RuntimeError('No parts to combine')
+    reference = None
+    xing = False
+    frames = 0
+    audio_bytes = 0
+    seconds = 0.0
+    bitrates = set()
+    with open(out_path, 'wb') as out:
+        for pf in part_files:
+            with open(pf, 'rb') as fh:
+                data = fh.read()
+            found = list(_iter_mp3_frames(data))
+            if reference is None and found:
+                reference = found[0][1]
+                # reserve room for the Xing/Info frame, rewritten once counts are known
+                xing = reference['layer'] == 1
+                if xing:
+                    out.write(_mp3_xing_frame(reference, 0, 0, False))
+            if reference is None:
+                continue
+            if any(_mp3_format_key(h) != _mp3_format_key(reference) for _, h in found):
+                data = _transcode_mp3_part(pf, reference)
+                found = list(_iter_mp3_frames(data))
+                if any(_mp3_format_key(h) != _mp3_format_key(reference) for _, h in found):
+                    raise RuntimeError(f'Could not match audio format of {os.path.basename(pf)}')
+            for offset, header in found:
+                out.write(data[offset:offset + header['length']])
+                frames += 1
+                audio_bytes += header['length']
+                bitrates.add(header['bitrate'])
+                seconds += header['samples'] / float(header['sample_rate'])
+        if reference is None:
+            raise RuntimeError('No MP3 frames found in parts')
+        if xing:
+            out.seek(0)
+            out.write(_mp3_xing_frame(reference, frames, audio_bytes, len(bitrates) > 1))
+    return seconds
+
+
+def _concat_wav_parts(part_files, out_path):
+    """Concatenate WAV parts by copying their PCM frames into ``out_path``.
+
+    Parts with a different sample rate / width / channel count than the first
+    one are converted with pydub. Returns the duration of the output in seconds.
+    """
+    if not part_files:
+        raise RuntimeError('No parts to combine')
+    params = None
+    with wave.open(out_path, 'wb') as out:
+        for pf in part_files:
+            with wave.open(pf, 'rb') as src:
+                fmt = (src.getnchannels(), src.getsampwidth(), src.getframerate())
+                if params is None:
+                    params = fmt
+                    out.setnchannels(fmt[0])
+                    out.setsampwidth(fmt[1])
+                    out.setframerate(fmt[2])
+                if fmt == params:
+                    while True:
+                        chunk = src.readframes(65536)
+                        if not chunk:
+                            break
+                        out.writeframes(chunk)
+                    continue
+            if not PYDUB_AVAILABLE:
+                raise RuntimeError(f'{os.path.basename(pf)} does not match the other parts and pydub is not available')
+            seg = AudioSegment.from_wav(pf).set_channels(params[0]).set_sample_width(params[1]).set_frame_rate(params[2])
+            out.writeframes(seg.raw_data)
+    with wave.open(out_path, 'rb') as src:
+        return src.getnframes() / float(src.getframerate())
+
+
+def _audio_duration(path):
+    """Duration of an MP3 or WAV file in seconds, from its frames rather than decoding."""
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as src:
+            return src.getnframes() / float(src.getframerate())
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    return sum(header['samples'] / float(header['sample_rate']) for _, header in _iter_mp3_frames(data))
+
+
+def _combine_parts(part_files, out_path):
+    """Join per-part audio files into ``out_path`` without re-encoding them; returns its duration."""
+    if out_path.lower().endswith('.wav'):
+        return _concat_wav_parts(part_files, out_path)
+    return _concat_mp3_parts(part_files, out_path)
+
+
+# Worker processes for the CPU-heavy stages (reading documents, joining audio),
+# so concurrent jobs use more than one core; 0 keeps that work in the job thread
+CPU_WORKERS = max(0, _env_int('DOCUVOICE_CPU_WORKERS', os.cpu_count() or 1))
+_CPU_POOL = None
+_CPU_POOL_LOCK = threading.Lock()
+
+
+def _cpu_pool():
+    """The process pool, started on first use; None when DOCUVOICE_CPU_WORKERS is 0."""
+    global _CPU_POOL
+    with _CPU_POOL_LOCK:
+        if _CPU_POOL is None and CPU_WORKERS:
+            # spawn rather than fork: forking a process that runs threads can copy locks held by them
+            _CPU_POOL = ProcessPoolExecutor(max_workers=CPU_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _CPU_POOL
+
+
+def _reset_cpu_pool(pool):
+    """Drop a pool whose worker died, so the next task starts a fresh one."""
+    global _CPU_POOL
+    with _CPU_POOL_LOCK:
+        if _CPU_POOL is pool:
+            _CPU_POOL = None
+    pool.shutdown(wait=False)
+
+
+def _submit_cpu(pool, fn, *args):
+    try:
+        return pool.submit(fn, *args)
+    except BrokenProcessPool:
+        _reset_cpu_pool(pool)
+        raise
 
-        total_parts = max(1, len(parts))
 
-        # Estimate work based on file size + number of parts
+def _cpu_result(pool, future):
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        _reset_cpu_pool(pool)
+        raise
+
+
+def _run_cpu(fn, *args):
+    """Run ``fn(*args)`` in the process pool, or here without one.
+
+    Only file paths and small results cross between processes, never audio.
+    """
+    pool = _cpu_pool()
+    if pool is None:
+        return fn(*args)
+    return _cpu_result(pool, _submit_cpu(pool, fn, *args))
+
+
+LIBRARY = LibraryIndex(LIBRARY_DB, AUDIO_FOLDER)
+
+
+def _part_duration_path(part_path):
+    return f"{part_path}.duration"
+
+
+def _record_part_duration(audio_path, part_path):
+    """Save the duration of ``audio_path`` for the playlist entry of ``part_path``."""
+    _write_file(_part_duration_path(part_path), f'{_audio_duration(audio_path):.3f}'.encode('ascii'))
+
+
+def _part_duration(part_path):
+    """Duration of a finished part, as recorded when it was written."""
+    try:
+        with open(_part_duration_path(part_path), 'rb') as fh:
+            return float(fh.read())
+    except (OSError, ValueError):
+        # written by a run that didn't record durations yet; measure it once
+        duration = _audio_duration(part_path)
         try:
-            file_size = os.path.getsize(word_file)
-        except Exception:
-            file_size = 0
+            _write_file(_part_duration_path(part_path), f'{duration:.3f}'.encode('ascii'))
+        except OSError:
+            pass
+        return duration
+
+
+def _synthesize_part(text, part_path, lang='en', engine=None, timings=None):
+    """Synthesize a single paragraph to ``part_path``, reusing cached audio when possible."""
+    engine = get_tts_engine(engine)
+    key = TTS_CACHE.key(text, lang, engine.name)
+    # write under a temporary name so a crash never leaves a truncated part behind
+    tmp_path = f"{part_path}.tmp"
+    if not TTS_CACHE.fetch(key, tmp_path):
+        _synthesize_with_retries(engine, text, lang, tmp_path, timings)
+        TTS_CACHE.store(key, tmp_path)
+    # the duration is saved before the part appears, so the playlist never has to measure it
+    _record_part_duration(tmp_path, part_path)
+    os.replace(tmp_path, part_path)
+    return part_path
+
+
+def _retry_delay(attempt):
+    """Backoff before retry ``attempt`` (0-based): full jitter over an exponential cap."""
+    return random.uniform(0, min(TTS_RETRY_MAX_SECONDS, TTS_RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+def _synthesize_with_retries(engine, text, lang, out_path, timings=None):
+    """Call the engine through its rate limiter, retrying throttled and transient failures.
+
+    With ``timings``, the engine calls are timed as 'synthesize', apart from
+    the 'rate_limit_wait' before each call and the 'retry_backoff' sleeps.
+    """
+    limiter = TTS_LIMITERS.get(engine.name)
+    for attempt in range(TTS_RETRIES + 1):
+        if limiter is not None:
+            with _stage(timings, 'rate_limit_wait'):
+                limiter.acquire()
+        try:
+            with _stage(timings, 'synthesize'):
+                engine.synthesize(text, lang, out_path)
+        except Exception as e:
+            kind = engine.error_kind(e)
+            if kind == 'throttled' and limiter is not None:
+                limiter.throttled()
+            if kind is None or attempt == TTS_RETRIES:
+                raise
+            TTS_RETRIES_TOTAL.inc(engine.name, kind)
+            delay = _retry_delay(attempt)
+            app.logger.warning(f"{engine.name} call failed ({e}); retry {attempt + 1}/{TTS_RETRIES} in {delay:.1f}s")
+            with _stage(timings, 'retry_backoff'):
+                time.sleep(delay)
+        else:
+            if limiter is not None:
+                limiter.succeeded()
+            return
+
+
+async def _synthesize_with_retries_async(engine, text, lang, out_path, timings=None):
+    """``_synthesize_with_retries`` for the asyncio engine: same limiter, retry budget and timings."""
+    limiter = TTS_LIMITERS.get(engine.name)
+    for attempt in range(TTS_RETRIES + 1):
+        if limiter is not None:
+            with _stage(timings, 'rate_limit_wait'):
+                await asyncio.sleep(limiter.reserve())
+        try:
+            with _stage(timings, 'synthesize'):
+                await engine.synthesize_async(text, lang, out_path)
+        except Exception as e:
+            kind = engine.error_kind(e)
+            if kind == 'throttled' and limiter is not None:
+                limiter.throttled()
+            if kind is None or attempt == TTS_RETRIES:
+                raise
+            TTS_RETRIES_TOTAL.inc(engine.name, kind)
+            delay = _retry_delay(attempt)
+            app.logger.warning(f"{engine.name} call failed ({e}); retry {attempt + 1}/{TTS_RETRIES} in {delay:.1f}s")
+            with _stage(timings, 'retry_backoff'):
+                await asyncio.sleep(delay)
+        else:
+            if limiter is not None:
+                limiter.succeeded()
+            return
+
+
+async def _synthesize_part_async(text, part_path, lang, engine, timings=None):
+    """``_synthesize_part`` as a coroutine; cache and file operations run in the loop's executor."""
+    loop = asyncio.get_running_loop()
+    key = TTS_CACHE.key(text, lang, engine.name)
+    tmp_path = f"{part_path}.tmp"
+    if not await loop.run_in_executor(None, TTS_CACHE.fetch, key, tmp_path):
+        await _synthesize_with_retries_async(engine, text, lang, tmp_path, timings)
+        await loop.run_in_executor(None, TTS_CACHE.store, key, tmp_path)
+    await loop.run_in_executor(None, _record_part_duration, tmp_path, part_path)
+    await loop.run_in_executor(None, os.replace, tmp_path, part_path)
+    return part_path
+
+
+class AsyncSynthesizer:
+    """One event loop thread that runs the synthesis calls of every job in the process.
+
+    A waiting call is a coroutine of a few KB rather than a thread, so
+    hundreds can be in flight; a semaphore caps how many run at once, and
+    engines with a ``max_concurrency`` get a tighter semaphore of their own.
+    """
+
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.loop = None
+        self.semaphore = None
+        # per-engine semaphores, only touched from the loop thread
+        self.engine_semaphores = {}
+        self.lock = threading.Lock()
+
+    def _start(self):
+        with self.lock:
+            if self.loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    # created on the loop's own thread, which older Pythons require
+                    self.semaphore = asyncio.Semaphore(self.concurrency)
+                    ready.set()
+                    loop.run_forever()
+
+                threading.Thread(target=run, name='tts-async', daemon=True).start()
+                ready.wait()
+                self.loop = loop
+        return self.loop
+
+    def _engine_semaphore(self, engine):
+        if engine.name not in self.engine_semaphores:
+            self.engine_semaphores[engine.name] = asyncio.Semaphore(
+                min(self.concurrency, engine.max_concurrency or self.concurrency))
+        return self.engine_semaphores[engine.name]
+
+    async def _run(self, text, part_path, engine, timings):
+        # wait for the engine's own limit first, so waiting calls don't hold shared slots
+        async with self._engine_semaphore(engine), self.semaphore:
+            TTS_ASYNC_IN_FLIGHT.inc()
+            try:
+                return await _synthesize_part_async(text, part_path, 'en', engine, timings)
+            finally:
+                TTS_ASYNC_IN_FLIGHT.dec()
+
+    def submit(self, text, part_path, engine, timings=None):
+        """Queue one part; returns a ``concurrent.futures.Future`` like a thread pool would."""
+        return asyncio.run_coroutine_threadsafe(self._run(text, part_path, engine, timings), self._start())
+
+
+ASYNC_TTS = AsyncSynthesizer(TTS_ASYNC_CONCURRENCY)
+
+
+def _job_tmp_folder(job_id, module_name):
+    """Folder that holds a job's per-part audio while it runs."""
+    return os.path.join(AUDIO_FOLDER, module_name, f"tmp_{job_id}")
+
+
+def _job_part_path(job_id, module_name, idx, extension):
+    return os.path.join(_job_tmp_folder(job_id, module_name), f"{job_id}_{idx}.{extension}")
+
 
-        with JOBS_LOCK:
-            JOBS[job_id]['progress'] = 8
-            JOBS[job_id]['message'] = f'Preparing {total_parts} parts'
-            JOBS[job_id]['detail'] = f'0/{total_parts}'
+# sentence end: terminal punctuation, optional closing quotes/brackets, then whitespace
+_SENTENCE_BREAK = re.compile(r'(?:(?<=[.!?\u2026])|(?<=[.!?\u2026]["\'\u201d\u2019)\]]))\s+')
+_CLAUSE_BREAKS = ('; ', ': ', ', ', ' - ', ' \u2013 ', ' \u2014 ')
+
+
+def _split_sentence(sentence, limit):
+    """Split a sentence longer than ``limit`` at clause punctuation, else at a space."""
+    while len(sentence) > limit:
+        cut = max(sentence.rfind(sep, 0, limit) for sep in _CLAUSE_BREAKS)
+        if cut < limit // 2:
+            cut = sentence.rfind(' ', 0, limit)
+        if cut <= 0:
+            cut = limit
+        else:
+            cut += 1  # keep the punctuation with the first piece
+        yield sentence[:cut].strip()
+        sentence = sentence[cut:].strip()
+    if sentence:
+        yield sentence
+
+
+def chunk_text_parts(paragraphs, target_chars=TTS_CHUNK_CHARS):
+    """Pack paragraphs into parts of at most ``target_chars`` characters.
+
+    Consecutive short paragraphs (headings, list items) are merged into one
+    request, and paragraphs longer than the target are split at sentence
+    boundaries, so a sentence is only ever cut when it alone exceeds the target.
+    Works as a generator so synthesis can start before extraction has finished.
+    """
+    buf = []
+    size = 0
+    for para in paragraphs:
+        for line in para.splitlines():
+            line = ' '.join(line.split())
+            if not line:
+                continue
+            if len(line) > target_chars:
+                pieces = []
+                for sentence in _SENTENCE_BREAK.split(line):
+                    pieces.extend(_split_sentence(sentence.strip(), target_chars))
+            else:
+                pieces = [line]
+            for piece in pieces:
+                if not piece:
+                    continue
+                if buf and size + 1 + len(piece) > target_chars:
+                    yield ' '.join(buf)
+                    buf = []
+                    size = 0
+                if buf and buf[-1][-1].isalnum():
+                    # end merged headings with a full stop so the voice pauses before the next line
+                    buf[-1] += '.'
+                    size += 1
+                buf.append(piece)
+                size += len(piece) + (1 if size else 0)
+    if buf:
+        yield ' '.join(buf)
+
+
+def _start_background_conversion(job_id, word_file, module_name, chunk_chars=TTS_CHUNK_CHARS, engine=None,
+                                 output_label='word_to_audio', source_name=None, source_hash=None):
+    """Background worker that converts a Word file (or saved text) to audio and updates job progress.
+
+    Paragraphs are packed into parts of about ``chunk_chars`` characters and
+    handed to the synthesis pool while the document is still being parsed, so
+    the first part is generated before extraction finishes.
+    Parts already written to ``tmp_<job_id>`` by an earlier, interrupted run of
+    the same job are kept, so a resumed job continues from where it stopped.
+    Time spent in each stage is saved on the job as ``timings``.
+    """
+    timings = JobTimings()
+    try:
+        _update_job(job_id, progress=3, message='Reading document')
+        engine = get_tts_engine(engine)
 
         # create module folder and temporary folder for parts
         module_folder = os.path.join(AUDIO_FOLDER, module_name)
         os.makedirs(module_folder, exist_ok=True)
-        tmp_folder = os.path.join(module_folder, f"tmp_{job_id}")
+        tmp_folder = _job_tmp_folder(job_id, module_name)
         os.makedirs(tmp_folder, exist_ok=True)
 
+        parts = []
         part_files = []
+        total_parts = None  # unknown until the extractor reaches the end of the document
 
-        # Generate per-part audio and update progress gradually
-        for idx, part in enumerate(parts):
-            with JOBS_LOCK:
-                JOBS[job_id]['message'] = f'Generating part {idx+1}/{total_parts}'
-                JOBS[job_id]['detail'] = f'{idx+1}/{total_parts}'
-
-            # generate MP3 for this part
+        def report(completed):
+            known = total_parts or len(parts)
+            # update progress: map parts generation into 10..85 range
+            progress = 8 + int((completed / max(1, known)) * 77)
+            if total_parts is None:
+                # the document isn't fully read yet, keep some headroom
+                progress = min(progress, 50)
+            _update_job(
+                job_id,
+                message=f'Generated part {completed}/{known}' + ('' if total_parts else '+'),
+                detail=f'{completed}/{known}',
+                progress=min(progress, 95),
+            )
+
+        # Generate per-part audio on a bounded pool; part_files keeps document order
+        # while progress follows the number of parts actually finished.
+        # Engines that support it run on the shared asyncio engine instead of threads.
+        completed = 0
+        futures = set()
+        use_async = TTS_ASYNC and engine.supports_async()
+        with (contextlib.nullcontext() if use_async else ThreadPoolExecutor(max_workers=TTS_WORKERS)) as pool:
+            if use_async:
+                def submit(part, part_path):
+                    return ASYNC_TTS.submit(part, part_path, engine, timings)
+            else:
+                def submit(part, part_path):
+                    return pool.submit(_synthesize_part, part, part_path, engine=engine.name, timings=timings)
             try:
-                part_tts = gTTS(text=part, lang='en')
-                part_path = os.path.join(tmp_folder, f"{job_id}_{idx}.mp3")
-                part_tts.save(part_path)
-                part_files.append(part_path)
+                # 'extract' covers reading the document and cutting it into parts
+                chunks = timings.iterate('extract', _iter_source_parts(word_file, chunk_chars, tmp_folder))
+                for idx, part in enumerate(chunks):
+                    part_path = _job_part_path(job_id, module_name, idx, engine.extension)
+                    parts.append(part)
+                    part_files.append(part_path)
+                    if os.path.exists(part_path):
+                        completed += 1
+                        continue
+                    futures.add(submit(part, part_path))
+                    # collect parts that finished meanwhile so progress moves during extraction
+                    finished = {f for f in futures if f.done()}
+                    for f in finished:
+                        f.result()
+                    if finished:
+                        futures -= finished
+                        completed += len(finished)
+                        report(completed)
+
+                if not parts:
+                    raise RuntimeError('The document does not contain any text')
+                total_parts = len(parts)
+                _update_job(
+                    job_id,
+                    message=f'Generating {total_parts} parts',
+                    detail=f'{completed}/{total_parts}',
+                    total_parts=total_parts,
+                )
+
+                for future in as_completed(futures):
+                    future.result()
+                    completed += 1
+                    report(completed)
             except Exception as e:
-                with JOBS_LOCK:
-                    JOBS[job_id]['status'] = 'error'
-                    JOBS[job_id]['message'] = f'Error generating part: {str(e)}'
-                    JOBS[job_id]['progress'] = 100
+                # don't start parts that are still queued once one has failed
+                for f in futures:
+                    f.cancel()
+                _update_job(job_id, status='error', message=f'Error generating part: {str(e)}', progress=100,
+                            timings=timings.summary())
                 return
 
-            # update progress: map parts generation into 10..85 range
-            made = idx + 1
-            progress = 8 + int((made / total_parts) * 77)
-            with JOBS_LOCK:
-                JOBS[job_id]['progress'] = min(progress, 95)
-
-        # Combine parts into final MP3
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        audio_filename = f"{module_name}_word_to_audio_{timestamp}.mp3"
+        # Combine parts into the final audio file
+        audio_filename = _output_filename(module_name, output_label, engine.extension, token=job_id)
         audio_path = os.path.join(module_folder, audio_filename)
 
-        if PYDUB_AVAILABLE and part_files:
-            try:
-                combined = None
-                for pf in part_files:
-                    seg = AudioSegment.from_file(pf, format='mp3')
-                    if combined is None:
-                        combined = seg
-                    else:
-                        combined += seg
-                if combined is None:
-                    raise RuntimeError('No parts to combine')
-                combined.export(audio_path, format='mp3')
-            except Exception as e:
-                # fallback: create single file from full text
-                try:
-                    audio_path = convert_text_to_audio(text, module_name)
-                except Exception as ee:
-                    with JOBS_LOCK:
-                        JOBS[job_id]['status'] = 'error'
-                        JOBS[job_id]['message'] = f'Error combining parts: {str(e)}; fallback failed: {str(ee)}'
-                        JOBS[job_id]['progress'] = 100
-                    return
-        else:
-            # pydub not available, perform single-shot TTS as fallback
-            try:
-                audio_path = convert_text_to_audio(text, module_name)
-            except Exception as e:
-                with JOBS_LOCK:
-                    JOBS[job_id]['status'] = 'error'
-                    JOBS[job_id]['message'] = f'Error generating audio: {str(e)}'
-                    JOBS[job_id]['progress'] = 100
-                return
+        _update_job(job_id, message='Combining parts')
 
-        # remove temporary part files
+        duration = None
         try:
-            for pf in part_files:
-                if os.path.exists(pf):
-                    os.remove(pf)
-            if os.path.isdir(tmp_folder):
-                os.rmdir(tmp_folder)
-        except Exception:
-            pass
+            with timings.stage('combine'):
+                duration = _run_cpu(_combine_parts, part_files, audio_path)
+        except Exception as e:
+            # fallback: create single file from full text
+            try:
+                with timings.stage('combine_fallback'):
+                    audio_path = convert_text_to_audio("\n".join(parts), module_name, engine=engine.name)
+            except Exception as ee:
+                _update_job(
+                    job_id,
+                    status='error',
+                    message=f'Error combining parts: {str(e)}; fallback failed: {str(ee)}',
+                    progress=100,
+                    timings=timings.summary(),
+                )
+                return
 
-        with JOBS_LOCK:
-            JOBS[job_id]['progress'] = 96
-            JOBS[job_id]['message'] = 'Finalizing'
-            JOBS[job_id]['audio_path'] = audio_path
+        with timings.stage('finalize'):
+            LIBRARY.record(audio_path, module_name, source_name=source_name, job_id=job_id, engine=engine.name,
+                           source_hash=source_hash, duration=duration)
+            _update_job(job_id, progress=96, message='Finalizing', audio_path=audio_path)
 
-        # small pause so frontend can reach 100% visibly
-        time.sleep(0.5)
+            # small pause so frontend can reach 100% visibly
+            time.sleep(0.5)
 
-        with JOBS_LOCK:
-            JOBS[job_id]['progress'] = 100
-            JOBS[job_id]['status'] = 'done'
-            JOBS[job_id]['message'] = 'Completed'
+        _update_job(job_id, progress=100, status='done', message='Completed', timings=timings.summary())
+        # streams and playlists of a finished job read the combined file, so the parts can go
+        shutil.rmtree(tmp_folder, ignore_errors=True)
 
     except Exception as e:
-        with JOBS_LOCK:
-            JOBS[job_id]['status'] = 'error'
-            JOBS[job_id]['message'] = f'Error: {str(e)}'
-            JOBS[job_id]['progress'] = 100
+        _update_job(job_id, status='error', message=f'Error: {str(e)}', progress=100, timings=timings.summary())
 
     finally:
         # Optionally remove the uploaded word file to save space
+        _remove_upload(word_file)
+
+
+FFMPEG_BIN = os.environ.get('DOCUVOICE_FFMPEG_BIN', 'ffmpeg')
+# Browser recordings are re-encoded to this format: (extension, ffmpeg codec arguments)
+VOICE_FORMATS = {
+    'opus': ('ogg', ['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip']),
+    'mp3': ('mp3', ['-c:a', 'libmp3lame', '-b:a', '64k']),
+}
+VOICE_FORMAT = os.environ.get('DOCUVOICE_VOICE_FORMAT', 'opus').lower()
+if VOICE_FORMAT not in VOICE_FORMATS:
+    VOICE_FORMAT = 'opus'
+# EBU R128 speech target: -16 LUFS integrated, -1.5 dBTP peak
+VOICE_LOUDNORM = 'loudnorm=I=-16:TP=-1.5:LRA=11'
+PEAKS_FOLDER = os.path.join(AUDIO_FOLDER, '_peaks')
+PEAKS_SAMPLE_RATE = 8000
+PEAKS_COUNT = 1000
+
+
+def _sniff_audio_container(path):
+    """Name the container of an audio file from its magic bytes, or None if unknown."""
+    with open(path, 'rb') as fh:
+        head = fh.read(12)
+    if head.startswith(b'\x1a\x45\xdf\xa3'):
+        return 'webm'
+    if head.startswith(b'OggS'):
+        return 'ogg'
+    if head.startswith(b'RIFF') and head[8:12] == b'WAVE':
+        return 'wav'
+    if head[4:8] == b'ftyp':
+        return 'm4a'
+    if head.startswith(b'ID3') or _mp3_frame_header(head, 0) is not None:
+        return 'mp3'
+    return None
+
+
+def _ffmpeg_available():
+    return shutil.which(FFMPEG_BIN) is not None
+
+
+def _peaks_path(audio_path):
+    module = os.path.basename(os.path.dirname(audio_path))
+    return os.path.join(PEAKS_FOLDER, module, os.path.basename(audio_path) + '.json')
+
+
+def _write_peaks(audio_path):
+    """Write a waveform-peaks JSON for ``audio_path``; returns the duration in seconds.
+
+    The audio is decoded to 8 kHz mono PCM by ffmpeg and read from the pipe a
+    block at a time, keeping the loudest sample of every 10 ms, then those are
+    folded down to at most PEAKS_COUNT values between 0 and 1.
+    """
+    window = PEAKS_SAMPLE_RATE // 100
+    maxima = []
+    samples = 0
+    proc = subprocess.Popen(
+        [FFMPEG_BIN, '-nostdin', '-v', 'error', '-i', audio_path, '-ac', '1', '-ar', str(PEAKS_SAMPLE_RATE),
+         '-f', 's16le', '-'],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            block = proc.stdout.read(window * 2 * 512)
+            if not block:
+                break
+            pcm = array.array('h', block[:len(block) - len(block) % 2])
+            samples += len(pcm)
+            for i in range(0, len(pcm), window):
+                piece = pcm[i:i + window]
+                maxima.append(max(max(piece), -min(piece)))
+    finally:
+        proc.stdout.close()
+        if proc.wait(timeout=TTS_SUBPROCESS_TIMEOUT) != 0:
+            raise RuntimeError('ffmpeg could not decode the recording for peaks')
+    per_peak = max(1, -(-len(maxima) // PEAKS_COUNT))
+    peaks = [round(max(maxima[i:i + per_peak]) / 32768, 3) for i in range(0, len(maxima), per_peak)]
+    duration = samples / PEAKS_SAMPLE_RATE
+    path = _peaks_path(audio_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as fh:
+        json.dump({'duration': round(duration, 3), 'peaks': peaks}, fh, separators=(',', ':'))
+    os.replace(f"{path}.tmp", path)
+    return duration
+
+
+def _transcode_voice(job_id, source_path, module_name, container):
+    """Background job: loudness-normalize a browser recording and store it compressed.
+
+    Writes the VOICE_FORMAT output and its peaks JSON. Without ffmpeg, or if
+    transcoding fails, the original is kept under its real extension so the
+    recording is never lost.
+    """
+    module_folder = os.path.join(AUDIO_FOLDER, module_name)
+    os.makedirs(module_folder, exist_ok=True)
+    timings = JobTimings()
+    try:
+        _update_job(job_id, progress=10, message='Transcoding recording')
+        extension, codec_args = VOICE_FORMATS[VOICE_FORMAT]
+        audio_path = os.path.join(module_folder, _output_filename(module_name, 'voice_recording', extension, job_id))
+        duration = None
         try:
-            if os.path.exists(word_file):
-                os.remove(word_file)
-        except Exception:
-            pass
+            if not _ffmpeg_available():
+                raise RuntimeError(f'{FFMPEG_BIN} not found')
+            with timings.stage('transcode'):
+                result = subprocess.run(
+                    [FFMPEG_BIN, '-nostdin', '-v', 'error', '-y', '-i', source_path, '-vn', '-af', VOICE_LOUDNORM,
+                     '-ac', '1', '-ar', '48000' if VOICE_FORMAT == 'opus' else '44100', *codec_args,
+                     '-f', extension, f"{audio_path}.tmp"],
+                    capture_output=True, timeout=TTS_SUBPROCESS_TIMEOUT,
+                )
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip()[-300:] or 'ffmpeg failed')
+            os.replace(f"{audio_path}.tmp", audio_path)
+        except Exception as e:
+            _remove_upload(f"{audio_path}.tmp")
+            app.logger.warning(f"Keeping voice recording untranscoded: {e}")
+            audio_path = os.path.join(
+                module_folder, _output_filename(module_name, 'voice_recording', container, job_id))
+            shutil.move(source_path, audio_path)
+        else:
+            _update_job(job_id, progress=70, message='Measuring waveform')
+            try:
+                with timings.stage('peaks'):
+                    duration = _write_peaks(audio_path)
+            except Exception as e:
+                # the recording itself is fine; the player just draws no waveform
+                app.logger.warning(f"Could not compute peaks for {audio_path}: {e}")
+
+        LIBRARY.record(audio_path, module_name, source_name='Voice recording', job_id=job_id, duration=duration)
+        _update_job(job_id, status='done', progress=100, message='Done', audio_path=audio_path,
+                    timings=timings.summary())
+    except Exception as e:
+        _update_job(job_id, status='error', message=f'Error: {str(e)}', progress=100, timings=timings.summary())
+    finally:
+        _remove_upload(source_path)
+
+
+def _build_batch_archive(job_id):
+    """Pack the audio of a finished batch into one zip, named after the source documents."""
+    timings = JobTimings()
+    try:
+        children = JOB_STORE.children(job_id)
+        done = [c for c in children if c['status'] == 'done' and c.get('audio_path')
+                and os.path.exists(c['audio_path'])]
+        if not done:
+            raise RuntimeError('None of the documents could be converted')
+        _update_job(job_id, progress=96, message='Packing archive')
+        os.makedirs(BATCH_FOLDER, exist_ok=True)
+        archive_path = os.path.join(BATCH_FOLDER, _output_filename('batch', 'audio', 'zip', job_id))
+        used = set()
+        failed = []
+        with timings.stage('archive'):
+            # audio is already compressed, so store it as is
+            with zipfile.ZipFile(f"{archive_path}.tmp", 'w', zipfile.ZIP_STORED) as zf:
+                for child in children:
+                    source_name = child['params'].get('source_name') or child['id']
+                    if child not in done:
+                        failed.append(f"{source_name}: {child.get('message') or child['status']}")
+                        continue
+                    stem = os.path.splitext(os.path.basename(source_name))[0] or 'document'
+                    arcname = f"{stem}{os.path.splitext(child['audio_path'])[1]}"
+                    n = 1
+                    while arcname.lower() in used:
+                        n += 1
+                        arcname = f"{stem} ({n}){os.path.splitext(child['audio_path'])[1]}"
+                    used.add(arcname.lower())
+                    zf.write(child['audio_path'], arcname)
+                if failed:
+                    zf.writestr('errors.txt', '\n'.join(failed) + '\n')
+            os.replace(f"{archive_path}.tmp", archive_path)
+        _update_job(job_id, status='done', progress=100, audio_path=archive_path,
+                    message=f'Converted {len(done)}/{len(children)} documents', timings=timings.summary())
+    except Exception as e:
+        _update_job(job_id, status='error', message=f'Error: {str(e)}', progress=100, timings=timings.summary())
+
 
 @app.route("/", methods=["GET"])
 def home():
@@ -213,13 +2612,13 @@ def home():
 @app.route("/text-to-speech", methods=["GET"])
 def text_to_speech_page():
     """Page to convert text to speech."""
-    return render_template("text_to_speech.html")
+    return render_template("text_to_speech.html", tts_engines=_listed_tts_engines())
 
 
 @app.route("/word-to-speech", methods=["GET"])
 def word_to_speech_page():
     """Page to upload Word file and convert it to speech."""
-    return render_template("word_to_speech.html")
+    return render_template("word_to_speech.html", tts_engines=_listed_tts_engines())
 
 
 @app.route("/voice-recording", methods=["GET"])
@@ -228,47 +2627,347 @@ def voice_recording_page():
     return render_template("voice_recording.html")
 
 
+# Largest accepted request body; bigger uploads are refused with 413
+MAX_UPLOAD_BYTES = max(1, _env_int('DOCUVOICE_MAX_UPLOAD_MB', 50)) * 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
+UPLOAD_COPY_CHUNK = 1024 * 1024
+# a .docx is a zip archive, which starts with a local file header
+DOCX_MAGIC = b'PK\x03\x04'
+# uploads that must be zip archives, by extension, with how to name them in errors
+ZIP_UPLOADS = {'.docx': 'a valid .docx document', '.zip': 'a valid .zip archive'}
+
+
+class UploadRejected(Exception):
+    """An upload that fails validation, possibly before it has been fully received.
+
+    Not a ValueError: Werkzeug's form parser silently drops those.
+    """
+
+
+class _UploadSpool:
+    """Where Werkzeug writes one uploaded file: straight into ``uploads/``, hashed as it arrives.
+
+    The multipart parser feeds ``write`` in small pieces, so memory use stays
+    flat whatever the size, and a .docx or .zip that doesn't start like a zip
+    archive is refused after its first bytes.
+    """
+
+    def __init__(self, folder, filename):
+        self.path = os.path.join(folder, f".upload_{uuid.uuid4().hex}.part")
+        # what the file claims to be, if that means it has to be a zip archive
+        self.expect_zip = ZIP_UPLOADS.get(os.path.splitext(filename or '')[1].lower())
+        self.claimed = False
+        self.size = 0
+        self.head = b''
+        self._hash = hashlib.sha256()
+        self._fh = open(self.path, 'w+b')
+
+    def write(self, data):
+        if len(self.head) < len(DOCX_MAGIC):
+            self.head += bytes(data[:len(DOCX_MAGIC) - len(self.head)])
+            if self.expect_zip and not DOCX_MAGIC.startswith(self.head):
+                raise UploadRejected(f'The uploaded file is not {self.expect_zip}')
+        self.size += len(data)
+        if self.size > MAX_UPLOAD_BYTES:
+            # bodies without a Content-Length aren't caught by MAX_CONTENT_LENGTH up front
+            raise RequestEntityTooLarge()
+        self._hash.update(data)
+        return self._fh.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def discard(self):
+        self._fh.close()
+        _remove_upload(self.path)
+
+    def __getattr__(self, name):
+        # read/seek/close and friends go to the file on disk
+        return getattr(self._fh, name)
+
+
+class UploadRequest(Request):
+    """Request whose file uploads are spooled into UPLOAD_FOLDER instead of a temp file."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        spool = _UploadSpool(UPLOAD_FOLDER, filename)
+        self.__dict__.setdefault('upload_spools', []).append(spool)
+        return spool
+
+
+app.request_class = UploadRequest
+
+
+@app.teardown_request
+def _discard_unclaimed_uploads(exc=None):
+    for spool in request.__dict__.get('upload_spools', ()):
+        if not spool.claimed:
+            spool.discard()
+
+
+@app.errorhandler(UploadRejected)
+def _upload_rejected(e):
+    return jsonify({'message': str(e)}), 400
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def _upload_too_large(e):
+    return jsonify({'message': f'Upload too large (limit {MAX_UPLOAD_BYTES // (1024 * 1024)} MB)'}), 413
+
+
+def _copy_hashed(src, dest, limit=None):
+    """Copy the file object ``src`` to ``dest`` in chunks; returns ``(sha256, size)``.
+
+    With ``limit``, raises OverflowError as soon as more than ``limit`` bytes
+    have been written.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(dest, 'wb') as fh:
+        while True:
+            chunk = src.read(UPLOAD_COPY_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            if limit is not None and size > limit:
+                raise OverflowError(f'{dest} exceeds {limit} bytes')
+            digest.update(chunk)
+            fh.write(chunk)
+    return digest.hexdigest(), size
+
+
+def _claim_upload(file, dest):
+    """Move an uploaded file to ``dest`` and return its sha256."""
+    spool = file.stream
+    if not isinstance(spool, _UploadSpool):
+        # not spooled by UploadRequest, so copy it instead
+        return _copy_hashed(spool, dest)[0]
+    if spool.expect_zip and spool.head != DOCX_MAGIC:
+        raise UploadRejected(f'The uploaded file is not {spool.expect_zip}')
+    spool.close()
+    # a rename when dest is on the same disk as uploads/
+    shutil.move(spool.path, dest)
+    spool.claimed = True
+    return spool.hexdigest()
+
+
+def _source_hash(content_hash, kind, params):
+    """Key identifying a document together with the settings that shape its audio."""
+    key = json.dumps([content_hash, kind, params.get('engine'), params.get('chunk_chars')])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _enqueue_upload(kind, source_path, module_name, params, content_hash, parent_id=None):
+    """Queue a conversion, or reuse the output or running job of an identical upload."""
+    source_hash = _source_hash(content_hash, kind, params)
+    entry = LIBRARY.find_by_hash(source_hash)
+    if entry is None:
+        return _enqueue_job(kind, source_path, module_name, params, source_hash=source_hash, parent_id=parent_id)
+    # already converted with the same settings: finish at once with the existing file
+    _remove_upload(source_path)
+    job_id = uuid.uuid4().hex
+    JOB_STORE.create(job_id, kind, None, module_name, params, status='done', source_hash=source_hash,
+                     parent_id=parent_id)
+    JOB_STORE.update(job_id, status='done', progress=100, message='Done (already converted)',
+                     audio_path=entry['path'])
+    app.logger.info(f"Reused {entry['path']} for job {job_id}")
+    return job_id
+
+
+def _job_started_response(job_id, heading=None, **context):
+    """Respond to a queued job: JSON for API clients, the progress page for browsers."""
+    if request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json':
+        payload = {
+            'job_id': job_id,
+            'status_url': url_for('job_status', job_id=job_id),
+            'events_url': url_for('job_events', job_id=job_id),
+        }
+        job = JOB_STORE.get(job_id)
+        if job and job['kind'] in JOB_OUTPUT_LABELS:
+            # only text and Word jobs write parts that can be listened to while they run
+            payload['stream_url'] = url_for('job_stream', job_id=job_id)
+            payload['playlist_url'] = url_for('job_playlist', job_id=job_id)
+        if job and job['status'] == 'done':
+            # deduplicated upload: the audio is already there
+            return jsonify({**payload, **_job_payload(job)}), 200
+        return jsonify(payload), 202
+    return render_template('processing.html', job_id=job_id, heading=heading, **context)
+
+
 @app.route("/text-to-audio", methods=["POST"])
 def text_to_audio():
-    """Route to handle text-to-speech conversion."""
+    """Route to handle text-to-speech conversion.
+
+    The text is saved and converted by the background worker pool, the same way
+    as Word uploads, so long texts don't hold up the request.
+    """
     text = request.form['text']
     module_name = 'text_to_speech'  # Name of the module to save in the folder
+    if not text.strip():
+        return jsonify({'message': 'No text to convert'}), 400
+    try:
+        engine = get_requested_tts_engine(request.form.get('engine'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    text_file_path = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4().hex}.txt")
+    data = text.encode('utf-8')
+    with open(text_file_path, 'wb') as fh:
+        fh.write(data)
 
-    # Convert text to audio
-    audio_path = convert_text_to_audio(text, module_name)
+    # the first line of the text names the entry in the library
+    source_name = text.strip().splitlines()[0][:80]
+    job_id = _enqueue_upload('text', text_file_path, module_name, {
+        'chunk_chars': TTS_CHUNK_CHARS,
+        'engine': engine.name,
+        'source_name': source_name,
+    }, hashlib.sha256(data).hexdigest())
+    app.logger.info(f"Created job {job_id} for {len(text)} characters of text")
 
-    # After saving the audio, show a success animation then redirect to home
-    return render_template('success.html', message='Text converted to audio', redirect_url=url_for('home'), delay_ms=1500)
+    return _job_started_response(job_id, heading='Converting text to audio')
 
 
 @app.route("/word-to-audio", methods=["POST"])
 def word_to_audio():
     """Route to handle Word file upload and conversion to audio."""
     file = request.files['file']
+    try:
+        engine = get_requested_tts_engine(request.form.get('engine'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     if file and file.filename.endswith('.docx'):
         # ensure a unique filename to avoid collisions
-        unique_name = f"{uuid.uuid4().hex}_{file.filename}"
+        unique_name = f"{uuid.uuid4().hex}_{secure_filename(file.filename) or 'document.docx'}"
         word_file_path = os.path.join(UPLOAD_FOLDER, unique_name)
-        file.save(word_file_path)
+        content_hash = _claim_upload(file, word_file_path)
 
         module_name = 'word_to_speech'  # Name of the module to save in the folder
 
-        # Create a job and start background worker
-        job_id = uuid.uuid4().hex
-        with JOBS_LOCK:
-            JOBS[job_id] = {
-                'status': 'pending',
-                'progress': 0,
-                'message': 'Queued',
-                'audio_path': None,
-            }
+        # Queue a job for the background worker pool
+        # settings are pinned on the job so a resumed job cuts and voices the same parts
+        job_id = _enqueue_upload('word', word_file_path, module_name, {
+            'chunk_chars': TTS_CHUNK_CHARS,
+            'engine': engine.name,
+            'source_name': file.filename,
+        }, content_hash)
         app.logger.info(f"Created job {job_id} for {word_file_path}")
 
-        worker = threading.Thread(target=_start_background_conversion, args=(job_id, word_file_path, module_name), daemon=True)
-        worker.start()
-
         # Render a processing page that will poll the job status
-        return render_template('processing.html', job_id=job_id)
+        return _job_started_response(job_id)
+
+    return jsonify({'message': 'Please upload a .docx file'}), 400
+
+
+# Most documents one batch may hold, counting those inside uploaded zips
+BATCH_MAX_DOCUMENTS = max(1, _env_int('DOCUVOICE_BATCH_MAX_DOCUMENTS', 200))
+# Most bytes the documents unpacked from one batch's zips may add up to
+BATCH_MAX_EXTRACTED_BYTES = max(1, _env_int('DOCUVOICE_BATCH_MAX_EXTRACTED_MB', 500)) * 1024 * 1024
+BATCH_FOLDER = os.path.join(AUDIO_FOLDER, 'batch')
+
+
+def _extract_batch_zip(zip_path, budget=None):
+    """Unpack the .docx files of an uploaded zip into uploads/.
+
+    Returns ``[(name, path, sha256), ...]``. Folders are flattened, and
+    anything that isn't a .docx (or is an Office lock file) is skipped.
+    Sizes are counted as the data is written, not taken from the zip's
+    headers; ``budget`` (a one-item list, shared across the zips of a batch)
+    holds the bytes still allowed under BATCH_MAX_EXTRACTED_BYTES.
+    """
+    if budget is None:
+        budget = [BATCH_MAX_EXTRACTED_BYTES]
+    documents = []
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            for info in zf.infolist():
+                name = os.path.basename(info.filename)
+                if (info.is_dir() or info.filename.startswith('__MACOSX/') or name.startswith(('.', '~$'))
+                        or not name.lower().endswith('.docx')):
+                    continue
+                if info.file_size > MAX_UPLOAD_BYTES:
+                    raise UploadRejected(f'{name} is too large (limit {MAX_UPLOAD_BYTES // (1024 * 1024)} MB)')
+                if len(documents) >= BATCH_MAX_DOCUMENTS:
+                    raise UploadRejected(f'Too many documents (limit {BATCH_MAX_DOCUMENTS})')
+                path = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4().hex}_{secure_filename(name) or 'document.docx'}")
+                documents.append((name, path, None))
+                limit = min(MAX_UPLOAD_BYTES, budget[0])
+                try:
+                    with zf.open(info) as src:
+                        content_hash, size = _copy_hashed(src, path, limit)
+                except OverflowError:
+                    if limit < MAX_UPLOAD_BYTES:
+                        raise UploadRejected('The documents in the batch are too large altogether '
+                                             f'(limit {BATCH_MAX_EXTRACTED_BYTES // (1024 * 1024)} MB)') from None
+                    raise UploadRejected(f'{name} is too large (limit {MAX_UPLOAD_BYTES // (1024 * 1024)} MB)') from None
+                budget[0] -= size
+                documents[-1] = (name, path, content_hash)
+    except Exception as e:
+        for _, path, _ in documents:
+            _remove_upload(path)
+        if isinstance(e, zipfile.BadZipFile):
+            raise UploadRejected('The uploaded file is not a valid .zip archive') from e
+        raise
+    return documents
+
+
+@app.route("/batch-to-audio", methods=["POST"])
+def batch_to_audio():
+    """Convert many Word documents at once.
+
+    Accepts several ``files`` fields, each a .docx or a .zip of them. Every
+    document becomes its own job in the queue, so they convert in parallel;
+    a batch job follows their progress and, once all are finished, packs the
+    audio into one zip.
+    """
+    files = [f for f in request.files.getlist('files') if f and f.filename]
+    try:
+        engine = get_requested_tts_engine(request.form.get('engine'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    if not files:
+        return jsonify({'message': 'Please upload .docx files or a .zip of them'}), 400
+    if any(not f.filename.lower().endswith(('.docx', '.zip')) for f in files):
+        return jsonify({'message': 'Only .docx and .zip files can be converted'}), 400
+
+    documents = []
+    budget = [BATCH_MAX_EXTRACTED_BYTES]
+    try:
+        for file in files:
+            path = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4().hex}_{secure_filename(file.filename) or 'upload'}")
+            content_hash = _claim_upload(file, path)
+            if file.filename.lower().endswith('.zip'):
+                try:
+                    documents += _extract_batch_zip(path, budget)
+                finally:
+                    _remove_upload(path)
+            else:
+                documents.append((file.filename, path, content_hash))
+            if len(documents) > BATCH_MAX_DOCUMENTS:
+                raise UploadRejected(f'Too many documents (limit {BATCH_MAX_DOCUMENTS})')
+        if not documents:
+            raise UploadRejected('No .docx documents found in the upload')
+    except Exception:
+        for _, path, _ in documents:
+            _remove_upload(path)
+        raise
+
+    # the batch waits for its documents, then the queue runs it to build the archive;
+    # it only starts waiting once all are queued, so a quick first one can't release it early
+    batch_id = uuid.uuid4().hex
+    JOB_STORE.create(batch_id, 'batch', None, 'batch', {'documents': len(documents), 'engine': engine.name},
+                     status='preparing', message='Queueing documents')
+    for name, path, content_hash in documents:
+        _enqueue_upload('word', path, 'word_to_speech', {
+            'chunk_chars': TTS_CHUNK_CHARS,
+            'engine': engine.name,
+            'source_name': name,
+        }, content_hash, parent_id=batch_id)
+    JOB_STORE.update(batch_id, status='waiting', message='Converting documents')
+    # covers batches whose documents were all converted before
+    _release_batch(batch_id)
+    _start_job_workers()
+    app.logger.info(f"Created batch {batch_id} for {len(documents)} documents")
+    return _job_started_response(batch_id, heading=f'Converting {len(documents)} documents to audio', batch=True)
 
 
 @app.route("/save-voice", methods=["POST"])
@@ -276,16 +2975,20 @@ def save_voice():
     """Save the recorded audio from the browser."""
     file = request.files['file']
     if file:
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         module_name = 'voice_recording'  # Name of the module to save in the folder
-        voice_filename = f"{module_name}_voice_recording_{timestamp}.wav"
-
-        # Create subfolder for voice recordings
-        module_folder = os.path.join(AUDIO_FOLDER, module_name)
-        os.makedirs(module_folder, exist_ok=True)
-
-        file_path = os.path.join(module_folder, voice_filename)
-        file.save(file_path)
+        source_path = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4().hex}_recording")
+        _claim_upload(file, source_path)
+        # browsers label the blob however they like, so go by its contents
+        container = _sniff_audio_container(source_path)
+        if container is None:
+            _remove_upload(source_path)
+            return jsonify({'message': 'Unsupported audio format'}), 400
+
+        # normalizing and compressing happens in the job queue
+        job_id = _enqueue_job('voice', source_path, module_name, {'container': container, 'format': VOICE_FORMAT})
+        app.logger.info(f"Created job {job_id} for a {container} voice recording")
+        if request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json':
+            return _job_started_response(job_id)
 
         # After saving the voice recording, show a success animation then redirect to home
         return render_template('success.html', message='Voice recording saved', redirect_url=url_for('home'), delay_ms=1500)
@@ -293,25 +2996,470 @@ def save_voice():
     return jsonify({'message': 'Failed to save audio'}), 400
 
 
-
+# Total size allowed for one chunked recording (each chunk is also capped by MAX_CONTENT_LENGTH)
+MAX_RECORDING_BYTES = max(1, _env_int('DOCUVOICE_MAX_RECORDING_MB', 500)) * 1024 * 1024
+VOICE_MIMETYPES = {'webm': 'audio/webm', 'ogg': 'audio/ogg', 'wav': 'audio/wav', 'm4a': 'audio/mp4', 'mp3': 'audio/mpeg'}
+
+
+def _upload_session_payload(session):
+    return {
+        'upload_id': session['id'],
+        'next_index': session['next_index'],
+        'size': session['size'],
+        'job_id': session['job_id'],
+        'chunk_url': url_for('voice_upload_chunk', upload_id=session['id'], index=session['next_index']),
+        'finalize_url': url_for('voice_upload_finalize', upload_id=session['id']),
+    }
+
+
+@app.route("/voice-upload", methods=["POST"])
+def voice_upload_start():
+    """Open a resumable recording upload.
+
+    The recorder then PUTs chunks 0, 1, 2, ... to ``/voice-upload/<id>/<n>``
+    while it is still recording, and POSTs ``/voice-upload/<id>/finalize``
+    when done. After a dropped connection, GET ``/voice-upload/<id>`` tells
+    it which chunk to send next.
+    """
+    upload_id = uuid.uuid4().hex
+    session = UPLOAD_SESSIONS.create(upload_id, os.path.join(UPLOAD_FOLDER, f"{upload_id}_recording"))
+    return jsonify(_upload_session_payload(session)), 201
+
+
+@app.route("/voice-upload/<upload_id>", methods=["GET"])
+def voice_upload_status(upload_id):
+    session = UPLOAD_SESSIONS.get(upload_id)
+    if session is None:
+        return jsonify({'message': 'Upload not found or expired'}), 404
+    return jsonify(_upload_session_payload(session))
+
+
+@app.route("/voice-upload/<upload_id>/<int:index>", methods=["PUT"])
+def voice_upload_chunk(upload_id, index):
+    """Append chunk ``index`` (the raw request body) to the recording."""
+    session = UPLOAD_SESSIONS.get(upload_id)
+    if session is None:
+        return jsonify({'message': 'Upload not found or expired'}), 404
+    if session['job_id']:
+        return jsonify({'message': 'Upload already finalized', **_upload_session_payload(session)}), 409
+    if index < session['next_index']:
+        # a retry of a chunk whose response got lost; it's already on disk
+        return jsonify(_upload_session_payload(session))
+    if index > session['next_index']:
+        return jsonify({'message': 'Chunks missing', **_upload_session_payload(session)}), 409
+    # chunks are a few seconds of audio, and MAX_CONTENT_LENGTH bounds them anyway
+    data = request.get_data(cache=False)
+    if session['size'] + len(data) > MAX_RECORDING_BYTES:
+        return jsonify({'message': f'Recording too large (limit {MAX_RECORDING_BYTES // (1024 * 1024)} MB)'}), 413
+    if not UPLOAD_SESSIONS.append(upload_id, index, data):
+        # another request for this session got in first
+        session = UPLOAD_SESSIONS.get(upload_id)
+        if session is not None and not session['job_id'] and index < session['next_index']:
+            return jsonify(_upload_session_payload(session))
+        return jsonify({'message': 'Upload changed concurrently, check its status', 'upload_id': upload_id}), 409
+    return jsonify(_upload_session_payload(UPLOAD_SESSIONS.get(upload_id)))
+
+
+@app.route("/voice-upload/<upload_id>/audio", methods=["GET"])
+def voice_upload_audio(upload_id):
+    """The recording received so far, so the recorder can play it back before saving."""
+    session = UPLOAD_SESSIONS.get(upload_id)
+    if session is None or session['job_id'] or not os.path.exists(session['path']):
+        return jsonify({'message': 'Upload not found or expired'}), 404
+    container = _sniff_audio_container(session['path'])
+    mimetype = VOICE_MIMETYPES.get(container, 'application/octet-stream')
+    return send_file(os.path.abspath(session['path']), mimetype=mimetype, conditional=True, max_age=0)
+
+
+@app.route("/voice-upload/<upload_id>/finalize", methods=["POST"])
+def voice_upload_finalize(upload_id):
+    """Close the upload and queue the recording for transcoding, like /save-voice."""
+    session = UPLOAD_SESSIONS.get(upload_id)
+    if session is None:
+        return jsonify({'message': 'Upload not found or expired'}), 404
+    job_id = session['job_id']
+    if not job_id:
+        container = _sniff_audio_container(session['path']) if session['size'] else None
+        if container is None:
+            return jsonify({'message': 'Unsupported audio format'}), 400
+        job_id = uuid.uuid4().hex
+        if UPLOAD_SESSIONS.finalize(upload_id, job_id):
+            _enqueue_job('voice', session['path'], 'voice_recording',
+                         {'container': container, 'format': VOICE_FORMAT}, job_id=job_id)
+            app.logger.info(f"Created job {job_id} for a {session['size']} byte chunked {container} recording")
+        else:
+            # finalized by a concurrent retry; answer with its job
+            job_id = UPLOAD_SESSIONS.get(upload_id)['job_id']
+    if request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json':
+        return _job_started_response(job_id)
+    return render_template('success.html', message='Voice recording saved', redirect_url=url_for('home'), delay_ms=1500)
+
+
+
+
+
+LIBRARY_PER_PAGE_MAX = 100
+
+
+@app.route('/library', methods=['GET'])
+def library():
+    """Paginated list of generated audio, read from the library index.
+
+    Query parameters: ``page``, ``per_page`` and an optional ``module`` filter.
+    Returns JSON when asked for (``?format=json`` or an Accept header), HTML otherwise.
+    """
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(LIBRARY_PER_PAGE_MAX, max(1, request.args.get('per_page', 20, type=int)))
+    module = request.args.get('module') or None
+    entries, total = LIBRARY.page(page, per_page, module)
+    items = [{
+        'filename': e['filename'],
+        'module': e['module'],
+        'source_name': e['source_name'],
+        'job_id': e['job_id'],
+        'duration': e['duration'],
+        'size': e['size'],
+        'engine': e['engine'],
+        'created_at': datetime.datetime.fromtimestamp(e['created_at']).isoformat(timespec='seconds'),
+        'url': _audio_url(e['path']),
+        'peaks_url': _peaks_url(e['path']) if e['module'] == 'voice_recording' else None,
+    } for e in entries]
+    pages = max(1, (total + per_page - 1) // per_page)
+    wants_json = request.args.get('format') == 'json' or \
+        request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
+    if wants_json:
+        return jsonify({'items': items, 'page': page, 'per_page': per_page, 'total': total, 'pages': pages})
+    return render_template('library.html', items=items, page=page, pages=pages, per_page=per_page,
+                           total=total, module=module)
+
+
+# Generated files never change once written (names are unique), so clients may cache them
+AUDIO_MAX_AGE_SECONDS = 3600
+
+
+@app.route('/audio/<module>/<filename>', methods=['GET'])
+def serve_audio(module, filename):
+    """Serve a generated audio file with Range, ETag and Last-Modified support.
+
+    ``conditional=True`` lets Werkzeug answer Range requests with 206 and
+    If-None-Match / If-Modified-Since with 304, so players can seek and
+    downloads can resume without fetching the whole file again.
+    """
+    if module.startswith(('.', '_')) or filename.startswith('tmp_'):
+        return jsonify({'message': 'Not found'}), 404
+    module_folder = os.path.join(os.path.abspath(AUDIO_FOLDER), module)
+    if not os.path.isdir(module_folder):
+        return jsonify({'message': 'Not found'}), 404
+    return send_from_directory(module_folder, filename, conditional=True, max_age=AUDIO_MAX_AGE_SECONDS)
+
+
+@app.route('/audio-peaks/<module>/<filename>', methods=['GET'])
+def serve_peaks(module, filename):
+    """Waveform peaks JSON of a recording, written alongside its transcoded audio."""
+    if module.startswith(('.', '_')):
+        return jsonify({'message': 'Not found'}), 404
+    module_folder = os.path.join(os.path.abspath(PEAKS_FOLDER), module)
+    if not os.path.isdir(module_folder):
+        return jsonify({'message': 'Not found'}), 404
+    return send_from_directory(module_folder, f"{filename}.json", conditional=True, max_age=AUDIO_MAX_AGE_SECONDS)
+
+
+def _stream_units(path, skip=0):
+    """Return ``(count, payload)`` for progressive playback of one part.
+
+    For MP3 the units are frames (tags and Xing headers dropped), for WAV they
+    are bytes of PCM data. ``count`` covers the whole part and ``payload``
+    leaves out its first ``skip`` units. Parts are small, so they are read whole.
+    """
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as src:
+            pcm = src.readframes(src.getnframes())
+        return len(pcm), pcm[skip:]
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    frames = [data[offset:offset + header['length']] for offset, header in _iter_mp3_frames(data)]
+    return len(frames), b''.join(frames[skip:])
+
+
+def _stream_units_at(path, seconds):
+    """Number of stream units (see ``_stream_units``) that play for ``seconds`` in the format of ``path``."""
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as src:
+            block = src.getnchannels() * src.getsampwidth()
+            return int(seconds * src.getframerate()) * block
+    with open(path, 'rb') as fh:
+        frame = next(_iter_mp3_file_frames(fh), None)
+    if frame is None:
+        return 0
+    header = _mp3_frame_header(frame, 0)
+    return int(seconds * header['sample_rate'] / header['samples'])
+
+
+# Frames of a finished file are sent in batches of about this many bytes
+STREAM_CHUNK_BYTES = 64 * 1024
+# Long-lived responses (/job-stream, /job-events) end after this many seconds and
+# the client reconnects, so a few open pages can't take every server thread
+JOB_STREAM_MAX_SECONDS = max(5, _env_int('DOCUVOICE_STREAM_MAX_SECONDS', 30))
+
+
+def _iter_mp3_file_frames(fh):
+    """Yield the audio frames of an MP3 file one by one, reading only as far as needed.
+
+    Handles what our outputs contain (ID3 tags and Xing/Info frames between
+    back-to-back frames); anything else ends the file.
+    """
+    while True:
+        head = fh.read(10)
+        if head[:3] == b'ID3' and len(head) == 10:
+            size = 0
+            for b in head[6:10]:
+                size = (size << 7) | (b & 0x7F)
+            fh.seek(size + (10 if head[5] & 0x10 else 0), os.SEEK_CUR)
+            continue
+        header = _mp3_frame_header(head, 0)
+        if header is None:
+            return
+        frame = head[:header['length']] + fh.read(header['length'] - len(head))
+        if len(frame) < header['length']:
+            return
+        tag_at = 4 + header['side_info']
+        if frame[tag_at:tag_at + 4] in (b'Xing', b'Info') or frame[36:40] == b'VBRI':
+            continue
+        yield frame
+
+
+def _stream_file_tail(path, skip):
+    """Yield a finished file's audio after its first ``skip`` units, in chunks."""
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as src:
+            src.setpos(min(src.getnframes(), skip // (src.getnchannels() * src.getsampwidth())))
+            block = max(1, STREAM_CHUNK_BYTES // (src.getnchannels() * src.getsampwidth()))
+            while True:
+                pcm = src.readframes(block)
+                if not pcm:
+                    return
+                yield pcm
+    with open(path, 'rb') as fh:
+        chunk = []
+        size = 0
+        for n, frame in enumerate(_iter_mp3_file_frames(fh)):
+            if n < skip:
+                continue
+            chunk.append(frame)
+            size += len(frame)
+            if size >= STREAM_CHUNK_BYTES:
+                yield b''.join(chunk)
+                chunk = []
+                size = 0
+        if chunk:
+            yield b''.join(chunk)
+
+
+def _wav_stream_header(path):
+    """RIFF header with an open-ended data size, for a WAV stream of unknown length."""
+    with wave.open(path, 'rb') as src:
+        channels, width, rate = src.getnchannels(), src.getsampwidth(), src.getframerate()
+    return (
+        b'RIFF' + (0xFFFFFFFF).to_bytes(4, 'little') + b'WAVE'
+        + b'fmt ' + (16).to_bytes(4, 'little') + (1).to_bytes(2, 'little')
+        + channels.to_bytes(2, 'little') + rate.to_bytes(4, 'little')
+        + (rate * channels * width).to_bytes(4, 'little') + (channels * width).to_bytes(2, 'little')
+        + (width * 8).to_bytes(2, 'little')
+        + b'data' + (0xFFFFFFFF).to_bytes(4, 'little')
+    )
+
+
+def _job_extension(job):
+    engine = TTS_ENGINES.get(job['params'].get('engine') or TTS_DEFAULT_ENGINE)
+    return engine.extension if engine else 'mp3'
+
+
+def _ready_parts(job):
+    """Paths of the parts written so far that form an unbroken run from part 0."""
+    ready = []
+    extension = _job_extension(job)
+    while True:
+        path = _job_part_path(job['id'], job['module_name'], len(ready), extension)
+        if not os.path.exists(path):
+            return ready
+        ready.append(path)
+
+
+@app.route('/job-stream/<job_id>', methods=['GET'])
+def job_stream(job_id):
+    """Stream a job's audio while it is still being generated.
+
+    Parts are sent in document order as soon as they exist in ``tmp_<job_id>``,
+    as one continuous chunked response. If the job has finished and its parts
+    are gone, the rest is read from the combined output file instead.
+    While the job runs the response ends after DOCUVOICE_STREAM_MAX_SECONDS,
+    so it doesn't hold a server thread for the whole job; the player then
+    reconnects with ``?start=<seconds already played>``.
+    """
+    job = JOB_STORE.get(job_id)
+    if not job or job['kind'] not in JOB_OUTPUT_LABELS or job['status'] == 'error':
+        return jsonify({'message': 'Job not found or failed'}), 404
+    extension = _job_extension(job)
+    start = max(0.0, request.args.get('start', 0.0, type=float))
+
+    def stream():
+        idx = 0
+        sent = 0  # MP3 frames or WAV data bytes already streamed or skipped
+        skip = 0 if not start else None  # units before ``start``, known once there is audio to measure
+        failures = 0
+        header_sent = extension != 'wav'
+        deadline = time.monotonic() + JOB_STREAM_MAX_SECONDS
+        while True:
+            with JOB_EVENTS:
+                seq = _JOB_EVENT_SEQ.get(job_id)
+            current = JOB_STORE.get(job_id)
+            if not current or current['status'] == 'error':
+                return
+            path = _job_part_path(job_id, current['module_name'], idx, extension)
+            if os.path.exists(path):
+                try:
+                    if skip is None:
+                        skip = _stream_units_at(path, start)
+                    if not header_sent:
+                        yield _wav_stream_header(path)
+                        header_sent = True
+                    count, payload = _stream_units(path, max(0, skip - sent))
+                except (OSError, EOFError, wave.Error):
+                    # removed meanwhile (e.g. by the reaper); the next round finds the combined file
+                    failures += 1
+                    if failures > 3:
+                        return
+                else:
+                    failures = 0
+                    if payload:
+                        yield payload
+                    sent += count
+                    idx += 1
+                    if time.monotonic() >= deadline:
+                        return
+                    continue
+            elif current['status'] == 'done' and current['audio_path']:
+                # the rest of the audio comes from the combined file, then the stream ends
+                try:
+                    if skip is None:
+                        skip = _stream_units_at(current['audio_path'], start)
+                    if not header_sent:
+                        yield _wav_stream_header(current['audio_path'])
+                    yield from _stream_file_tail(current['audio_path'], max(sent, skip))
+                except (OSError, EOFError, wave.Error):
+                    pass
+                return
+            elif current['status'] == 'done':
+                return
+            if time.monotonic() >= deadline:
+                return
+            with JOB_EVENTS:
+                JOB_EVENTS.wait_for(lambda: _JOB_EVENT_SEQ.get(job_id) != seq, timeout=1)
+
+    mimetype = 'audio/wav' if extension == 'wav' else 'audio/mpeg'
+    return Response(stream_with_context(stream()), mimetype=mimetype, headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/job-playlist/<job_id>.m3u8', methods=['GET'])
+def job_playlist(job_id):
+    """HLS-style playlist of the parts finished so far; once the job is done, of its combined file."""
+    job = JOB_STORE.get(job_id)
+    if not job or job['kind'] not in JOB_OUTPUT_LABELS:
+        return jsonify({'message': 'Job not found'}), 404
+    entries = []
+    if job['status'] == 'done' and _audio_url(job['audio_path']):
+        # the parts are deleted once combined, so a finished job is one entry for the whole file
+        duration = LIBRARY.duration(job['audio_path'])
+        if duration is None:
+            try:
+                duration = _audio_duration(job['audio_path'])
+            except (OSError, EOFError, wave.Error):
+                duration = 0.0
+        entries.append((duration, _audio_url(job['audio_path'])))
+    elif job['status'] not in JOB_FINISHED_STATES:
+        for idx, path in enumerate(_ready_parts(job)):
+            try:
+                entries.append((_part_duration(path), url_for('job_part', job_id=job_id, idx=idx)))
+            except (OSError, EOFError, wave.Error):
+                # removed meanwhile because the job just finished; the next request lists the whole file
+                break
+    lines = [
+        '#EXTM3U',
+        '#EXT-X-VERSION:3',
+        f"#EXT-X-TARGETDURATION:{max([1] + [int(d) + 1 for d, _ in entries])}",
+        '#EXT-X-MEDIA-SEQUENCE:0',
+        '#EXT-X-PLAYLIST-TYPE:EVENT',
+    ]
+    for duration, url in entries:
+        lines.append(f'#EXTINF:{duration:.3f},')
+        lines.append(url)
+    if job['status'] in JOB_FINISHED_STATES:
+        lines.append('#EXT-X-ENDLIST')
+    return Response('\n'.join(lines) + '\n', mimetype='application/vnd.apple.mpegurl',
+                    headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/job-part/<job_id>/<int:idx>', methods=['GET'])
+def job_part(job_id, idx):
+    """Serve one finished part of a job."""
+    job = JOB_STORE.get(job_id)
+    if not job or job['kind'] not in JOB_OUTPUT_LABELS:
+        return jsonify({'message': 'Job not found'}), 404
+    path = _job_part_path(job_id, job['module_name'], idx, _job_extension(job))
+    if not os.path.exists(path):
+        return jsonify({'message': 'Part not ready'}), 404
+    return send_from_directory(os.path.abspath(os.path.dirname(path)), os.path.basename(path), conditional=True)
 
 
 @app.route('/job-status/<job_id>', methods=['GET'])
 def job_status(job_id):
-    app.logger.info(f"job_status requested for {job_id}")
-    with JOBS_LOCK:
-        job = JOBS.get(job_id)
-        # log current job keys for easier debugging
-        app.logger.info(f"Current jobs: {list(JOBS.keys())}")
-        if not job:
-            # return a 200 with a notfound state so client JS can handle it gracefully
-            return jsonify({'status': 'notfound', 'message': 'Job not found or expired', 'progress': 0}), 200
-        return jsonify({
-            'status': job.get('status'),
-            'progress': job.get('progress', 0),
-            'message': job.get('message', ''),
-            'detail': job.get('detail', '')
-        })
+    # return a 200 with a notfound state so client JS can handle it gracefully
+    return jsonify(_job_payload(JOB_STORE.get(job_id)))
+
+
+# Streams re-read the store at least this often, which also picks up
+# progress written by other processes that can't notify this one
+JOB_EVENTS_POLL_SECONDS = max(1, _env_int('DOCUVOICE_EVENTS_POLL_SECONDS', 2))
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+# How long the browser waits before reconnecting to a closed event stream
+JOB_EVENTS_RETRY_MS = 1000
+
+
+@app.route('/job-events/<job_id>', methods=['GET'])
+def job_events(job_id):
+    """Server-Sent Events stream that pushes job progress as it changes.
+
+    Each response ends after DOCUVOICE_STREAM_MAX_SECONDS and EventSource
+    reconnects on its own, so an open progress page only holds a server
+    thread for a bounded time.
+    """
+    def stream():
+        last_payload = None
+        last_sent = time.time()
+        deadline = time.monotonic() + JOB_STREAM_MAX_SECONDS
+        yield f"retry: {JOB_EVENTS_RETRY_MS}\n\n"
+        while True:
+            with JOB_EVENTS:
+                seq = _JOB_EVENT_SEQ.get(job_id)
+            payload = _job_payload(JOB_STORE.get(job_id))
+            if payload != last_payload:
+                yield f"data: {json.dumps(payload)}\n\n"
+                last_payload = payload
+                last_sent = time.time()
+            elif time.time() - last_sent >= JOB_EVENTS_KEEPALIVE_SECONDS:
+                # comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                last_sent = time.time()
+            if payload['status'] in JOB_FINISHED_STATES + ('notfound',) or time.monotonic() >= deadline:
+                return
+            with JOB_EVENTS:
+                JOB_EVENTS.wait_for(lambda: _JOB_EVENT_SEQ.get(job_id) != seq, timeout=JOB_EVENTS_POLL_SECONDS)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 
 def _get_local_ip():
@@ -341,22 +3489,87 @@ def local_ip():
 @app.route('/_debug-jobs', methods=['GET'])
 def debug_jobs():
     """Debug-only endpoint that returns current jobs and statuses."""
-    with JOBS_LOCK:
-        return jsonify({k: {'status': v.get('status'), 'progress': v.get('progress')} for k, v in JOBS.items()})
+    return jsonify({job['id']: {'status': job['status'], 'progress': job['progress'], 'timings': job['timings']}
+                    for job in JOB_STORE.list()})
+
+
+@app.route('/_debug-reaper', methods=['GET'])
+def debug_reaper():
+    """Debug-only endpoint that reports what the job reaper has reclaimed."""
+    with REAPER_LOCK:
+        return jsonify(dict(REAPER_STATS))
+
+
+@app.route('/_debug-cache', methods=['GET'])
+def debug_cache():
+    """Debug-only endpoint that returns TTS segment cache counters."""
+    return jsonify(TTS_CACHE.stats())
+
+
+def _prom_sample(name, kind, help_text, value, labels=()):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    return lines + [f'{name}{_prom_labels(list(labels))} {_prom_value(value)}']
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics: stage and request timings, the job queue, TTS caching and rate limiting, the reaper."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+
+    counts = JOB_STORE.counts()
+    lines += _prom_sample('docuvoice_jobs_queued', 'gauge', 'Jobs waiting for a worker (all processes)',
+                          counts.get('pending', 0))
+    lines += _prom_sample('docuvoice_jobs_running', 'gauge', 'Jobs being converted (all processes)',
+                          counts.get('running', 0))
+    lines += _prom_sample('docuvoice_job_workers', 'gauge', 'Job worker threads in this process', JOB_WORKERS)
+
+    cache = TTS_CACHE.stats()
+    for key, kind, help_text in (
+        ('hits', 'counter', 'Segment cache hits'),
+        ('misses', 'counter', 'Segment cache misses'),
+        ('evictions', 'counter', 'Segments evicted from the cache'),
+    ):
+        lines += _prom_sample(f'docuvoice_tts_cache_{key}_total', kind, help_text, cache[key])
+    lines += _prom_sample('docuvoice_tts_cache_entries', 'gauge', 'Segments in the cache', cache['entries'])
+    lines += _prom_sample('docuvoice_tts_cache_bytes', 'gauge', 'Size of the cached segments', cache['bytes'])
+    lines += _prom_sample('docuvoice_tts_cache_hit_ratio', 'gauge', 'Share of lookups served from the cache',
+                          cache['hit_rate'])
+
+    limiters = {name: limiter.stats() for name, limiter in TTS_LIMITERS.items()}
+    for key, kind, help_text in (
+        ('rate', 'gauge', 'Requests per second the TTS rate limiter currently allows'),
+        ('throttles', 'counter', 'Throttled TTS calls (429 or no response)'),
+        ('waited_seconds', 'counter', 'Time synthesis calls spent waiting for the rate limiter'),
+    ):
+        name = f"docuvoice_tts_limiter_{key}{'_total' if kind == 'counter' else ''}"
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        lines += [f"{name}{_prom_labels([('engine', engine)])} {_prom_value(stats[key])}"
+                  for engine, stats in sorted(limiters.items())]
+
+    with REAPER_LOCK:
+        reaper = dict(REAPER_STATS)
+    for key in ('runs', 'jobs_expired', 'batches_failed', 'tmp_dirs_removed', 'uploads_removed', 'archives_removed',
+                'library_entries_removed', 'bytes_reclaimed'):
+        lines += _prom_sample(f'docuvoice_reaper_{key}_total', 'counter', f"Reaper {key.replace('_', ' ')}",
+                              reaper[key])
+
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 
 @app.route('/success-redirect/<job_id>', methods=['GET'])
 def success_redirect(job_id):
     # After job completes, show success animation and then redirect home
-    with JOBS_LOCK:
-        job = JOBS.get(job_id)
-        if not job:
-            return redirect(url_for('home'))
-        msg = job.get('message', 'Completed')
+    job = JOB_STORE.get(job_id)
+    if not job:
+        return redirect(url_for('home'))
+    msg = job.get('message', 'Completed')
     return render_template('success.html', message='Conversion complete', redirect_url=url_for('home'), delay_ms=1400)
 
 
 if __name__ == "__main__":
+    # Flask's development server; use serve.py (waitress/gunicorn) in production
     # Allow configuring host and port via environment variables so the server
     # can be bound to the LAN address (0.0.0.0) for access from other devices.
     host = os.environ.get('DOCUVOICE_HOST', '0.0.0.0')
@@ -369,6 +3582,9 @@ if __name__ == "__main__":
 
     app.logger.info(f"Starting DocuVoice on {host}:{port} (debug={debug})")
 
+    # resume jobs interrupted by a previous shutdown without waiting for a request
+    _start_job_workers()
+
     # Optional: advertise via mDNS/zeroconf if requested and available
     mdns_enabled = os.environ.get('DOCUVOICE_MDNS', '').lower() in ('1', 'true', 'yes')
     mdns_name = os.environ.get('DOCUVOICE_MDNS_NAME', 'docuvoice')